@@ -0,0 +1,114 @@
+import os
+
+import arcade
+
+import gamelog
+
+assets_log = gamelog.get_logger('assets')
+
+DIRECTIONS = ('up', 'down', 'left', 'right')
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+class AssetManifest:
+    """Индекс текстур, построенный одним сканированием папки
+
+    Вместо того чтобы перебирать имена файлов через исключения
+    arcade.load_texture, манифест один раз читает содержимое textures/
+    и textures/enemies/ и дальше отвечает на вопросы "какой файл для
+    (тип, направление, кадр)" поиском в множестве. Загруженные текстуры
+    кэшируются по пути.
+    """
+
+    def __init__(self, root="textures"):
+        self.root = root
+        self.files = None  # подпапка -> множество имён файлов
+        self.textures = {}
+
+    def scan(self):
+        """Сканирует папки с текстурами (выполняется один раз при первом запросе)"""
+        self.files = {}
+        for subdir in ('', 'enemies'):
+            folder = os.path.join(self.root, subdir) if subdir else self.root
+            try:
+                with os.scandir(folder) as entries:
+                    self.files[subdir] = {entry.name for entry in entries if entry.is_file()}
+            except FileNotFoundError:
+                self.files[subdir] = set()
+                if subdir == 'enemies':
+                    self.create_enemy_folder(folder)
+
+    @staticmethod
+    def create_enemy_folder(folder):
+        """Создает пустую папку для текстур врагов и подсказывает, как называть файлы"""
+        os.makedirs(folder, exist_ok=True)
+        assets_log.info(
+            "📁 Создана папка для текстур врагов: %s/\n"
+            "📝 Форматы имен файлов, которые поддерживаются:\n"
+            "   1. basic_up_0.png, basic_up_1.png (рекомендуемый)\n"
+            "   2. bas_up_0.png, bas_up_1.png (сокращенный)\n"
+            "   3. enemy_basic_up_0.png (с приставкой enemy_)", folder
+        )
+
+    def has(self, name, subdir=''):
+        if self.files is None:
+            self.scan()
+        return name in self.files.get(subdir, ())
+
+    def path(self, name, subdir=''):
+        """Путь к файлу из индекса или None"""
+        if not self.has(name, subdir):
+            return None
+        return f"{self.root}/{subdir}/{name}" if subdir else f"{self.root}/{name}"
+
+    @staticmethod
+    def enemy_candidates(enemy_type, direction, frame):
+        """Поддерживаемые имена файлов врага в порядке приоритета"""
+        type_lower = enemy_type.lower()
+        return (
+            # 1. Основной вариант: тип_направление_кадр
+            f"{type_lower}_{direction}_{frame}.png",
+            # 2. Сокращенный: первые 3 буквы типа
+            f"{type_lower[:3]}_{direction}_{frame}.png",
+            # 3. С приставкой enemy_
+            f"enemy_{type_lower}_{direction}_{frame}.png",
+            # 4. Без номера кадра (если только 1 кадр)
+            f"{type_lower}_{direction}.png",
+            f"{type_lower[:3]}_{direction}.png",
+            f"enemy_{type_lower}_{direction}.png",
+        )
+
+    def enemy_path(self, enemy_type, direction, frame):
+        """Путь к кадру врага или None, если файла нет"""
+        for name in self.enemy_candidates(enemy_type, direction, frame):
+            path = self.path(name, 'enemies')
+            if path:
+                return path
+        return None
+
+    def texture(self, name, subdir=''):
+        """Загружает текстуру из индекса (с кэшем). FileNotFoundError если файла нет"""
+        path = self.path(name, subdir)
+        if path is None:
+            raise FileNotFoundError(f"{self.root}/{subdir}/{name}" if subdir else f"{self.root}/{name}")
+        return self.load(path)
+
+    def load(self, path):
+        texture = self.textures.get(path)
+        if texture is None:
+            texture = self.textures[path] = arcade.load_texture(path, hash=path)
+        return texture
+
+    def image_paths(self):
+        """Пути ко всем картинкам из индекса (для фоновой загрузки)"""
+        if self.files is None:
+            self.scan()
+        paths = []
+        for subdir, names in self.files.items():
+            for name in sorted(names):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    paths.append(self.path(name, subdir))
+        return paths
+
+    def player_textures(self):
+        return {direction: self.texture(f"player_{direction}.png") for direction in DIRECTIONS}
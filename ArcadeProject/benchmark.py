@@ -0,0 +1,300 @@
+"""Бенчмарк покадрового обновления игры (без окна)
+
+Гоняет Simulation по заранее заданным сценариям и считает время каждой
+фазы тика: медиану, p95 и p99. Результаты можно сохранить в JSON и
+сравнить с прошлым прогоном:
+
+    python benchmark.py --output before.json
+    python benchmark.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import arcade
+import numpy as np
+
+import game
+from profiler import PhaseTimer
+
+FRAME_TIME = 1 / 60
+MAZE_TILESET = os.path.abspath("maps/maze4.tsx")
+CROWD_SIZES = (100, 200, 400, 800)  # Масштабирование расталкивания врагов
+
+
+def make_large_map(path, width, height, wall_chance=0.08, seed=0):
+    """Генерирует TMX-карту с фоном и слоем collision для сценария 'большая карта'"""
+    rng = random.Random(seed)
+    fon = ",".join("1" for _ in range(width * height))
+
+    rows = []
+    for row in range(height):
+        cells = []
+        for col in range(width):
+            border = row in (0, height - 1) or col in (0, width - 1)
+            cells.append("2" if border or rng.random() < wall_chance else "0")
+        rows.append(",".join(cells))
+    walls = ",\n".join(rows)
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f'''<?xml version="1.0" encoding="UTF-8"?>
+<map version="1.10" tiledversion="1.11.2" orientation="orthogonal" renderorder="right-down" width="{width}" height="{height}" tilewidth="16" tileheight="16" infinite="0" nextlayerid="4" nextobjectid="1">
+ <tileset firstgid="1" source="{MAZE_TILESET}"/>
+ <layer id="1" name="fon" width="{width}" height="{height}">
+  <data encoding="csv">{fon}</data>
+ </layer>
+ <layer id="2" name="walls" width="{width}" height="{height}">
+  <data encoding="csv">{walls}</data>
+ </layer>
+ <layer id="3" name="collision" width="{width}" height="{height}">
+  <data encoding="csv">{walls}</data>
+ </layer>
+</map>
+''')
+
+
+class Scenario:
+    """Сценарий: как подготовить симуляцию и что делать перед каждым кадром"""
+
+    def __init__(self, name, prepare, before_frame=None, map_size=None):
+        self.name = name
+        self.prepare = prepare
+        self.before_frame = before_frame
+        self.map_size = map_size
+
+
+def start_game(sim):
+    """Пропускаем отсчет и автоматический спавн волн"""
+    sim.countdown_active = False
+    sim.game_started = True
+    sim.finish_preload()
+    sim.wave_cleared = False
+    sim.max_enemies = 10 ** 6
+
+
+def camera_view(sim):
+    """Экран вокруг игрока - как у камеры окна (за кадром пули не синхронизируются)"""
+    x, y = sim.player.center_x, sim.player.center_y
+    return (x - game.SCREEN_WIDTH / 2, x + game.SCREEN_WIDTH / 2,
+            y - game.SCREEN_HEIGHT / 2, y + game.SCREEN_HEIGHT / 2)
+
+
+def random_point(rng, margin=60):
+    return (rng.uniform(margin, game.SCREEN_WIDTH - margin),
+            rng.uniform(margin, game.SCREEN_HEIGHT - margin))
+
+
+def horde(count, types):
+    def prepare(sim, rng):
+        start_game(sim)
+        composition = []
+        for _ in range(count):
+            x, y = random_point(rng)
+            composition.append((x, y, rng.choice(types)))
+        sim.spawn_batch(composition)
+    return prepare
+
+
+def crowd(count, radius=150):
+    """Толпа вплотную вокруг игрока: самые плотные ячейки сетки расталкивания
+
+    spawn_batch не ставит врагов ближе SPAWN_SEPARATION, поэтому враги
+    спавнятся пачками по сетке вдали от игрока и сразу сдвигаются в толпу -
+    точки сетки освобождаются для следующей пачки.
+    """
+    def prepare(sim, rng):
+        start_game(sim)
+        x, y = sim.player.center_x, sim.player.center_y
+        step = 2 * game.SPAWN_SEPARATION
+        grid = [(gx, gy, 'BASIC')
+                for gy in range(100, int(sim.field_height) - 100, step)
+                for gx in range(100, int(sim.field_width) - 100, step)
+                if np.hypot(gx - x, gy - y) > radius + step]
+
+        while len(sim.enemies) < count:
+            spawned = sim.spawn_batch(grid[:count - len(sim.enemies)])
+            if not spawned:
+                break
+            for enemy in spawned:
+                angle = rng.uniform(0, 2 * np.pi)
+                distance = radius * np.sqrt(rng.random())
+                enemy.position = (x + distance * np.cos(angle), y + distance * np.sin(angle))
+    return prepare
+
+
+def boss_wave(sim, rng):
+    start_game(sim)
+    sim.wave_number = game.BOSS_SPAWN_WAVE * 2
+    sim.spawn_wave()
+
+
+def bullet_storm(bullets):
+    def prepare(sim, rng):
+        horde(20, ['BASIC'])(sim, rng)
+
+    def before_frame(sim, rng):
+        # Держим постоянное количество вражеских пуль на экране
+        while sim.enemy_projectiles.count < bullets:
+            angle = rng.uniform(0, 2 * np.pi)
+            x, y = random_point(rng, margin=0)
+            sim.spawn_enemy_bullet(x, y, (np.cos(angle), np.sin(angle)), damage=0, speed=300)
+        sim.try_shoot()
+    return prepare, before_frame
+
+
+def build_scenarios():
+    storm_prepare, storm_frame = bullet_storm(2000)
+    return [
+        Scenario("basic_25", horde(25, ['BASIC'])),
+        Scenario("basic_100", horde(100, ['BASIC'])),
+        Scenario("basic_400", horde(400, ['BASIC'])),
+        Scenario("mixed_200", horde(200, game.ENEMY_TYPES)),
+        Scenario("boss_wave", boss_wave),
+        Scenario("bullet_storm_2000", storm_prepare, storm_frame),
+        Scenario("large_map_100", horde(100, game.ENEMY_TYPES), map_size=(256, 256)),
+    ] + [Scenario(f"crowd_{count}", crowd(count)) for count in CROWD_SIZES]
+
+
+def run_scenario(scenario, frames, warmup, seed, effects, map_dir):
+    rng = random.Random(seed)
+    random.seed(seed)
+
+    map_name = "maps/first_lvl.tmx"
+    if scenario.map_size:
+        map_name = os.path.join(map_dir, f"large_{scenario.map_size[0]}x{scenario.map_size[1]}.tmx")
+        if not os.path.exists(map_name):
+            make_large_map(map_name, *scenario.map_size, seed=seed)
+
+    sim = game.Simulation(effects=effects, seed=seed)
+    sim.setup(map_name)
+    scenario.prepare(sim, rng)
+
+    timer = PhaseTimer()
+    frame_times = []
+    for frame in range(warmup + frames):
+        if frame == warmup:
+            sim.timer = timer
+        if scenario.before_frame:
+            scenario.before_frame(sim, rng)
+        sim.player.health = sim.player.max_health  # Игрок бессмертен
+        sim.view = camera_view(sim)
+
+        start = time.perf_counter()
+        sim.step(FRAME_TIME)
+        if frame >= warmup:
+            frame_times.append(time.perf_counter() - start)
+
+    phases = {name: summarize(samples) for name, samples in timer.samples.items()}
+    phases["frame"] = summarize(frame_times)
+    return {
+        "phases": phases,
+        "enemies": len(sim.enemies),
+        "player_bullets": sim.player_projectiles.count,
+        "enemy_bullets": sim.enemy_projectiles.count,
+    }
+
+
+def summarize(samples):
+    ms = np.asarray(samples) * 1000.0
+    return {
+        "median_ms": float(np.median(ms)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results, baseline=None):
+    for name, result in results["scenarios"].items():
+        print(f"\n=== {name} (врагов: {result['enemies']}, пуль: "
+              f"{result['player_bullets']}/{result['enemy_bullets']}) ===")
+        print(f"{'фаза':<20}{'median':>10}{'p95':>10}{'p99':>10}")
+        old = (baseline or {}).get("scenarios", {}).get(name, {}).get("phases", {})
+        for phase, stats in result["phases"].items():
+            line = (f"{phase:<20}{stats['median_ms']:>10.3f}"
+                    f"{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}")
+            if phase in old and old[phase]["median_ms"] > 0:
+                change = stats["median_ms"] / old[phase]["median_ms"] - 1
+                line += f"  ({change:+.0%})"
+            print(line)
+
+    print_scaling(results)
+
+
+def print_scaling(results):
+    """Как растет enemy_physics с размером толпы: при линейном росте мс на врага не меняется"""
+    rows = []
+    for count in CROWD_SIZES:
+        result = results["scenarios"].get(f"crowd_{count}")
+        if result and "enemy_physics" in result["phases"] and result["enemies"]:
+            rows.append((result["enemies"], result["phases"]["enemy_physics"]["median_ms"]))
+    if len(rows) < 2:
+        return
+
+    print("\n=== масштабирование enemy_physics (толпа вокруг игрока) ===")
+    print(f"{'врагов':<10}{'median':>10}{'мкс/враг':>12}")
+    for enemies, ms in rows:
+        print(f"{enemies:<10}{ms:>10.3f}{ms * 1000 / enemies:>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-effects", action="store_true", help="не обновлять частицы")
+    parser.add_argument("--only", nargs="*", help="запустить только эти сценарии")
+    parser.add_argument("--output", help="куда записать результаты (JSON)")
+    parser.add_argument("--compare", help="JSON прошлого прогона для сравнения")
+    args = parser.parse_args()
+
+    scenarios = build_scenarios()
+    if args.only:
+        scenarios = [s for s in scenarios if s.name in args.only]
+
+    results = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "arcade": arcade.__version__,
+        "frames": args.frames,
+        "seed": args.seed,
+        "effects": not args.no_effects,
+        "scenarios": {},
+    }
+
+    with tempfile.TemporaryDirectory() as map_dir:
+        for scenario in scenarios:
+            print(f"▶ {scenario.name}...", file=sys.stderr)
+            results["scenarios"][scenario.name] = run_scenario(
+                scenario, args.frames, args.warmup, args.seed, not args.no_effects, map_dir
+            )
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Результаты сохранены в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
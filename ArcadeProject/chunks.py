@@ -0,0 +1,208 @@
+import os
+
+import arcade
+import numpy as np
+
+# Флаги отражения в старших битах gid (формат Tiled)
+FLIPPED_HORIZONTALLY = 0x80000000
+FLIPPED_VERTICALLY = 0x40000000
+FLIPPED_DIAGONALLY = 0x20000000
+GID_MASK = 0x1FFFFFFF
+
+
+def layer_grid(layer, height):
+    """gid слоя Tiled как массив [row, col], строки снизу вверх (как в arcade)"""
+    if not layer.data:
+        return None
+    return np.asarray(layer.data, dtype=np.uint32).reshape(height, -1)[::-1].copy()
+
+
+class TileTextures:
+    """gid -> текстура тайла. Текстура создается при первом запросе и кэшируется"""
+
+    def __init__(self, tilesets, map_directory):
+        # tilesets - {firstgid: описание тайлсета из levelcache.tileset_info}
+        self.firstgids = sorted(tilesets)
+        self.tilesets = tilesets
+        self.map_directory = map_directory
+        self.cache = {}
+
+    def get(self, gid):
+        texture = self.cache.get(gid)
+        if texture is None:
+            texture = self.cache[gid] = self.load(gid)
+        return texture
+
+    def load(self, gid):
+        tile_id = gid & GID_MASK
+        firstgid = max((first for first in self.firstgids if first <= tile_id), default=None)
+        if firstgid is None:
+            raise ValueError(f"Нет тайлсета для gid {tile_id}")
+        tileset = self.tilesets[firstgid]
+        local_id = tile_id - firstgid
+
+        if tileset["image"] is not None:
+            # Один атлас на весь тайлсет
+            column = local_id % tileset["columns"]
+            row = local_id // tileset["columns"]
+            texture = arcade.texture.default_texture_cache.load_or_get_texture(
+                self.resolve(tileset["image"]),
+                x=tileset["margin"] + column * (tileset["tile_width"] + tileset["spacing"]),
+                y=tileset["margin"] + row * (tileset["tile_height"] + tileset["spacing"]),
+                width=tileset["tile_width"],
+                height=tileset["tile_height"],
+            )
+        else:
+            # Коллекция отдельных картинок
+            texture = arcade.texture.default_texture_cache.load_or_get_texture(
+                self.resolve(tileset["tiles"][str(local_id)])
+            )
+
+        # Тот же порядок, что и у arcade.load_tilemap
+        if gid & FLIPPED_DIAGONALLY:
+            texture = texture.flip_diagonally()
+        if gid & FLIPPED_HORIZONTALLY:
+            texture = texture.flip_left_right()
+        if gid & FLIPPED_VERTICALLY:
+            texture = texture.flip_top_bottom()
+        return texture
+
+    def resolve(self, path):
+        return os.path.join(self.map_directory, path)
+
+
+class ChunkedLayer:
+    """Слой тайлов, разбитый на квадратные чанки по chunk_size тайлов
+
+    Спрайты создаются только для загруженных чанков. У каждого чанка свой
+    SpriteList (статичный, буфер на GPU строится один раз), draw() рисует
+    только загруженные. Если передан общий sprite_list, спрайты чанков
+    складываются в него (слой столкновений с пространственным хэшем).
+    """
+
+    def __init__(self, grid, textures, tile_width, tile_height, chunk_size, sprite_list=None):
+        self.grid = grid
+        self.textures = textures
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.chunk_size = chunk_size
+        self.sprite_list = sprite_list
+        self.chunks = {}  # (chunk_col, chunk_row) -> SpriteList или список спрайтов
+
+    def load(self, key):
+        if self.grid is None or key in self.chunks:
+            return
+        size = self.chunk_size
+        col0, row0 = key[0] * size, key[1] * size
+        block = self.grid[row0:row0 + size, col0:col0 + size]
+        rows, cols = np.nonzero(block)
+
+        sprites = []
+        for row, col in zip((rows + row0).tolist(), (cols + col0).tolist()):
+            texture = self.textures.get(int(self.grid[row, col]))
+            # Как в arcade: левый нижний угол спрайта - в углу клетки
+            sprites.append(arcade.Sprite(
+                texture,
+                center_x=col * self.tile_width + texture.width / 2,
+                center_y=row * self.tile_height + texture.height / 2,
+            ))
+
+        if self.sprite_list is not None:
+            self.sprite_list.extend(sprites)
+            self.chunks[key] = sprites
+        else:
+            chunk = arcade.SpriteList(capacity=max(1, len(sprites)))
+            chunk.extend(sprites)
+            self.chunks[key] = chunk
+
+    def unload(self, key):
+        sprites = self.chunks.pop(key, None)
+        if sprites is None:
+            return
+        if self.sprite_list is not None:
+            for sprite in sprites:
+                self.sprite_list.remove(sprite)
+
+    def draw(self):
+        """Рисует загруженные чанки, возвращает число вызовов отрисовки"""
+        if self.sprite_list is not None:
+            return 0
+        for chunk in self.chunks.values():
+            chunk.draw()
+        return len(self.chunks)
+
+    def __len__(self):
+        return sum(len(chunk) for chunk in self.chunks.values())
+
+
+class ChunkStreamer:
+    """Держит загруженными чанки вокруг видимой области
+
+    Загружаются чанки, задевающие область + margin, выгружаются - только
+    ушедшие дальше unload_margin (запас, чтобы чанки на границе не
+    грузились и не выгружались каждый кадр). За один вызов update()
+    загружается не больше loads_per_update чанков, ближние - первыми:
+    margin с запасом, поэтому чанк успевает загрузиться до того, как
+    попадет в кадр, а кадр не дергается на целом ряду чанков сразу.
+    """
+
+    def __init__(self, layers, grid_width, grid_height, tile_width, tile_height, chunk_size,
+                 margin=256, unload_margin=512, loads_per_update=1):
+        self.layers = layers
+        self.chunk_width = chunk_size * tile_width
+        self.chunk_height = chunk_size * tile_height
+        self.chunk_cols = -(-grid_width // chunk_size)
+        self.chunk_rows = -(-grid_height // chunk_size)
+        self.margin = margin
+        self.unload_margin = unload_margin
+        self.loads_per_update = loads_per_update
+        self.loaded = set()
+        self.pending = []  # чанки, которые нужны, но еще не загружены (ближние в конце)
+        self._last_range = None
+        self.loads = 0  # сколько чанков загружено всего (для профайлера)
+
+    def chunk_range(self, left, right, bottom, top, margin):
+        """Чанки, задевающие прямоугольник, расширенный на margin: (col0, col1, row0, row1)"""
+        col0 = max(0, int((left - margin) // self.chunk_width))
+        col1 = min(self.chunk_cols - 1, int((right + margin) // self.chunk_width))
+        row0 = max(0, int((bottom - margin) // self.chunk_height))
+        row1 = min(self.chunk_rows - 1, int((top + margin) // self.chunk_height))
+        return col0, col1, row0, row1
+
+    def update(self, left, right, bottom, top):
+        needed_range = self.chunk_range(left, right, bottom, top, self.margin)
+        if needed_range != self._last_range:
+            self._last_range = needed_range
+            self.plan(needed_range, left, right, bottom, top)
+
+        for _ in range(min(self.loads_per_update, len(self.pending))):
+            self.load(self.pending.pop())
+
+    def plan(self, needed_range, left, right, bottom, top):
+        """Пересчитывает очередь загрузки и выгружает далекие чанки"""
+        col0, col1, row0, row1 = needed_range
+        center_x = (left + right) / 2 / self.chunk_width - 0.5
+        center_y = (bottom + top) / 2 / self.chunk_height - 0.5
+        self.pending = sorted(
+            ((col, row) for row in range(row0, row1 + 1) for col in range(col0, col1 + 1)
+             if (col, row) not in self.loaded),
+            key=lambda key: -((key[0] - center_x) ** 2 + (key[1] - center_y) ** 2),
+        )
+
+        col0, col1, row0, row1 = self.chunk_range(left, right, bottom, top, self.unload_margin)
+        for key in [key for key in self.loaded
+                    if not (col0 <= key[0] <= col1 and row0 <= key[1] <= row1)]:
+            for layer in self.layers:
+                layer.unload(key)
+            self.loaded.discard(key)
+
+    def load(self, key):
+        for layer in self.layers:
+            layer.load(key)
+        self.loaded.add(key)
+        self.loads += 1
+
+    def flush(self):
+        """Загрузить всю очередь сразу (старт уровня: стены нужны с первого кадра)"""
+        while self.pending:
+            self.load(self.pending.pop())
@@ -0,0 +1,115 @@
+import numpy as np
+
+# Значение "стен нет вообще" - больше любого радиуса
+FAR = 1e9
+
+
+def _lower_envelope(f, spacing):
+    """Одномерное квадратичное преобразование расстояния вдоль строк f
+
+    Для каждой строки: out[c] = min по c' (f[c'] + ((c - c') * spacing)^2).
+    Алгоритм Felzenszwalb-Huttenlocher: нижняя огибающая парабол строится
+    за один проход по столбцам, второй проход читает ее - O(W) на строку.
+    Все строки идут одновременно: цикл по столбцам, операции над строками
+    векторные.
+    """
+    lines, width = f.shape
+    xs = np.arange(width, dtype=float) * spacing
+    heads = f + xs * xs  # f[c] + x^2 - без него точка пересечения считается с потерей точности
+    index = np.arange(lines)
+
+    k = np.zeros(lines, dtype=np.intp)  # номер последней параболы огибающей
+    v = np.zeros((lines, width), dtype=np.intp)  # столбцы парабол огибающей
+    z = np.empty((lines, width + 1))  # границы, где парабола v[k] минимальна
+    z[:, 0] = -np.inf
+    z[:, 1] = np.inf
+
+    for q in range(1, width):
+        todo = index
+        while len(todo):
+            vk = v[todo, k[todo]]
+            s = (heads[todo, q] - heads[todo, vk]) / (2 * (xs[q] - xs[vk]))
+            # Новая парабола закрывает последнюю целиком - ее выкидываем
+            covered = s <= z[todo, k[todo]]
+            done = todo[~covered]
+            k[done] += 1
+            v[done, k[done]] = q
+            z[done, k[done]] = s[~covered]
+            z[done, k[done] + 1] = np.inf
+            todo = todo[covered]
+            k[todo] -= 1
+
+    out = np.empty(f.shape)
+    k[:] = 0
+    for q in range(width):
+        while True:
+            behind = np.flatnonzero(z[index, k + 1] < xs[q])
+            if not len(behind):
+                break
+            k[behind] += 1
+        vk = v[index, k]
+        out[:, q] = (xs[q] - xs[vk]) ** 2 + f[index, vk]
+    return out
+
+
+def _distance_to(mask, tile_width, tile_height):
+    """Евклидово расстояние (в пикселях) от центра каждой клетки до центра ближайшей клетки mask
+
+    Два прохода: сначала по столбцам (для бинарной маски это просто
+    ближайшая клетка сверху или снизу - накопленный минимум), затем по
+    строкам - нижняя огибающая парабол (_lower_envelope). Оба прохода
+    линейны по числу клеток.
+    """
+    height, width = mask.shape
+    if not mask.any():
+        return np.full(mask.shape, FAR)
+
+    # 1. Вертикальное расстояние до ближайшей клетки mask в том же столбце
+    rows = np.arange(height, dtype=float)[:, None]
+    last_above = np.where(mask, rows, -np.inf)
+    last_above = np.maximum.accumulate(last_above, axis=0)
+    next_below = np.where(mask, rows, np.inf)
+    next_below = np.minimum.accumulate(next_below[::-1], axis=0)[::-1]
+    vertical = np.minimum(rows - last_above, next_below - rows) * tile_height
+    vertical_sq = np.minimum(vertical, FAR) ** 2
+
+    # 2. По строке: min по столбцам c' (vertical[c']^2 + ((c - c') * w)^2)
+    return np.sqrt(_lower_envelope(vertical_sq, tile_width))
+
+
+def signed_distance_field(solid, tile_width, tile_height):
+    """Поле расстояний до стен: > 0 снаружи, < 0 внутри стены
+
+    Возвращает (sdf, grad_x, grad_y) на сетке клеток; градиент - единичный
+    вектор в сторону от ближайшей стены.
+    """
+    half = min(tile_width, tile_height) / 2
+    outside = _distance_to(solid, tile_width, tile_height) - half
+    inside = _distance_to(~solid, tile_width, tile_height) - half
+    sdf = np.where(solid, -inside, outside)
+
+    if not solid.any():
+        zeros = np.zeros(solid.shape)
+        return sdf, zeros, zeros.copy()
+
+    grad_y, grad_x = np.gradient(sdf, tile_height, tile_width)
+    length = np.sqrt(grad_x * grad_x + grad_y * grad_y)
+    length[length < 1e-9] = 1.0
+    return sdf, grad_x / length, grad_y / length
+
+
+def sample(grid, xs, ys, tile_width, tile_height):
+    """Билинейная выборка значений grid (заданных в центрах клеток) в точках xs, ys"""
+    height, width = grid.shape
+    fx = np.clip(xs / tile_width - 0.5, 0, width - 1)
+    fy = np.clip(ys / tile_height - 0.5, 0, height - 1)
+    col0 = np.minimum(fx.astype(np.intp), width - 2) if width > 1 else np.zeros(len(xs), np.intp)
+    row0 = np.minimum(fy.astype(np.intp), height - 2) if height > 1 else np.zeros(len(ys), np.intp)
+    col1 = np.minimum(col0 + 1, width - 1)
+    row1 = np.minimum(row0 + 1, height - 1)
+    tx = fx - col0
+    ty = fy - row0
+
+    bottom = grid[row0, col0] * (1 - tx) + grid[row0, col1] * tx
+    top = grid[row1, col0] * (1 - tx) + grid[row1, col1] * tx
+    return bottom * (1 - ty) + top * ty
@@ -0,0 +1,220 @@
+class IndexedCollection:
+    """Обёртка над list или arcade.SpriteList с удалением через swap-remove
+
+    Индекс каждого объекта хранится в словаре, поэтому удаление не ищет
+    объект линейно: последний элемент переносится на место удаляемого.
+    Порядок элементов при этом не сохраняется.
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self.index = {obj: i for i, obj in enumerate(items)}
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __contains__(self, obj):
+        return obj in self.index
+
+    def add(self, obj):
+        if obj in self.index:
+            return
+        self.index[obj] = len(self.items)
+        self.items.append(obj)
+
+    def extend(self, objs):
+        """Добавляет много объектов одним вызовом (SpriteList.extend - одна запись в буфер)"""
+        objs = [obj for obj in objs if obj not in self.index]
+        start = len(self.items)
+        self.index.update((obj, start + i) for i, obj in enumerate(objs))
+        self.items.extend(objs)
+
+    def discard(self, obj):
+        """Удаляет объект, если он есть. Возвращает True, если удалили"""
+        i = self.index.pop(obj, None)
+        if i is None:
+            return False
+
+        last = len(self.items) - 1
+        if i != last:
+            moved = self.items[last]
+            if hasattr(self.items, 'swap'):
+                # arcade.SpriteList: swap + pop - самый дешёвый способ удаления
+                self.items.swap(i, last)
+            else:
+                self.items[i] = moved
+            self.index[moved] = i
+
+        self.items.pop()
+        return True
+
+
+class _Entity:
+    """Запись реестра: объект и всё, что к нему прикреплено"""
+
+    __slots__ = ('handle', 'obj', 'collection', 'sprite', 'light', 'emitter', 'on_destroy', 'light_style')
+
+    def __init__(self, handle, obj, collection, sprite, light, emitter, on_destroy, light_style=None):
+        self.handle = handle
+        self.obj = obj
+        self.collection = collection
+        self.sprite = sprite
+        self.light = light
+        self.emitter = emitter
+        self.on_destroy = on_destroy
+        self.light_style = light_style
+
+
+class EntityRegistry:
+    """Центральный реестр сущностей со стабильными хэндлами
+
+    Сущность создаётся через ``spawn``: её спрайт попадает в свою коллекцию,
+    свет - в LightManager (с типом = имя коллекции), след - в список эмиттеров. ``destroy`` только
+    помечает сущность, а всё удаление выполняется пачкой в ``flush``
+    в конце тика.
+    """
+
+    def __init__(self, lights=None, emitters=None):
+        self.lights = lights  # LightManager или None (без света)
+        self.collections = {}
+        self.entities = {}
+        self.attached = set()  # Свет, который мы зарегистрировали в lights
+        self.emitters = self.track('emitters', emitters if emitters is not None else [])
+        self.hidden = set()  # Хэндлы, скрытые через set_shown
+        self._pending = []
+        self._next_handle = 1
+
+    def track(self, name, items):
+        """Регистрирует коллекцию (list или SpriteList) под именем"""
+        collection = IndexedCollection(items)
+        self.collections[name] = collection
+        return collection
+
+    def spawn(self, obj, collection=None, sprite=None, light=None, emitter=None, on_destroy=None,
+              light_style=None):
+        """Добавляет сущность и возвращает её хэндл (light_style - см. LightManager.add)"""
+        handle = self._next_handle
+        self._next_handle += 1
+
+        if collection is not None:
+            self.collections[collection].add(sprite if sprite is not None else obj)
+
+        self.attach_light(light, collection or 'other', light_style)
+        if emitter is not None:
+            self.emitters.add(emitter)
+
+        self.entities[handle] = _Entity(handle, obj, collection, sprite, light, emitter, on_destroy,
+                                        light_style)
+        return handle
+
+    def spawn_many(self, objs, collection, lights=None):
+        """Пакетный spawn: все объекты - в коллекцию, весь свет - в LightManager за один вызов
+
+        lights - свет каждого объекта (или None). Возвращает хэндлы по порядку.
+        """
+        lights = lights if lights is not None else [None] * len(objs)
+        handles = range(self._next_handle, self._next_handle + len(objs))
+        self._next_handle += len(objs)
+
+        self.collections[collection].extend(objs)
+
+        new_lights = [light for light in lights if light is not None and light not in self.attached]
+        self.attached.update(new_lights)
+        if self.lights is not None and new_lights:
+            self.lights.add_many(new_lights, collection)
+
+        for handle, obj, light in zip(handles, objs, lights):
+            self.entities[handle] = _Entity(handle, obj, collection, None, light, None, None)
+        return list(handles)
+
+    def get(self, handle):
+        """Объект по хэндлу или None, если сущность уже удалена"""
+        entity = self.entities.get(handle)
+        return entity.obj if entity is not None else None
+
+    def is_alive(self, handle):
+        return handle in self.entities
+
+    def destroy(self, handle):
+        """Откладывает удаление сущности до конца тика"""
+        if handle in self.entities:
+            self._pending.append(handle)
+
+    def set_shown(self, handle, shown):
+        """Скрывает или снова показывает сущность, не удаляя ее
+
+        Спрайт остается в коллекции, но невидим; свет и след снимаются,
+        чтобы не висеть там, где сущность скрыли. Старые частицы следа
+        стираются сразу - иначе они останутся на месте скрытия.
+        """
+        entity = self.entities.get(handle)
+        if entity is None or shown == (handle not in self.hidden):
+            return
+
+        sprite = entity.sprite if entity.sprite is not None else entity.obj
+        if entity.collection is not None:
+            sprite.visible = shown
+
+        if shown:
+            self.hidden.discard(handle)
+            self.attach_light(entity.light, entity.collection or 'other', entity.light_style)
+            if entity.emitter is not None:
+                self.emitters.add(entity.emitter)
+        else:
+            self.hidden.add(handle)
+            self.detach_light(entity.light)
+            if entity.emitter is not None:
+                entity.emitter.clear()
+                self.emitters.discard(entity.emitter)
+
+    def attach_light(self, light, kind='other', style=None):
+        if light is None or light in self.attached:
+            return
+        self.attached.add(light)
+        if self.lights is not None:
+            self.lights.add(light, kind, style)
+
+    def detach_light(self, light):
+        if light is None or light not in self.attached:
+            return
+        self.attached.discard(light)
+        if self.lights is not None:
+            self.lights.remove(light)
+
+    def flush(self):
+        """Удаляет все помеченные сущности разом. Возвращает их количество"""
+        if not self._pending:
+            return 0
+
+        pending = self._pending
+        self._pending = []
+        removed = 0
+
+        for handle in pending:
+            entity = self.entities.pop(handle, None)
+            if entity is None:
+                continue  # Уже удалена (destroy вызвали дважды)
+
+            if entity.collection is not None:
+                target = entity.sprite if entity.sprite is not None else entity.obj
+                self.collections[entity.collection].discard(target)
+                if handle in self.hidden:
+                    # Объект может вернуться из пула - он должен быть видимым
+                    self.hidden.discard(handle)
+                    target.visible = True
+
+            self.detach_light(entity.light)
+            if entity.emitter is not None:
+                self.emitters.discard(entity.emitter)
+
+            if entity.on_destroy is not None:
+                entity.on_destroy(entity.obj)
+            removed += 1
+
+        return removed
+
+    def __len__(self):
+        return len(self.entities)
@@ -0,0 +1,74 @@
+class FixedStep:
+    """Аккумулятор фиксированного шага симуляции
+
+    Реальное время кадра копится в accumulator, а симуляция шагает ровно
+    по dt = 1 / tick_rate. Если кадр был очень длинным, выполняется не
+    больше max_steps тиков, а остаток отбрасывается (игра замедляется,
+    но не "телепортирует" пули и врагов сквозь стены).
+    """
+
+    def __init__(self, tick_rate=60, max_steps=5):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.dropped = 0.0  # сколько времени отброшено (для профайлера)
+
+    def advance(self, delta_time):
+        """Добавляет время кадра и возвращает, сколько тиков выполнить"""
+        self.accumulator += delta_time
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_steps:
+            self.dropped += (steps - self.max_steps) * self.dt
+            self.accumulator -= (steps - self.max_steps) * self.dt
+            steps = self.max_steps
+        self.accumulator -= steps * self.dt
+        return steps
+
+    @property
+    def alpha(self):
+        """Доля следующего тика, прошедшая с последнего: 0..1 (для интерполяции)"""
+        return min(1.0, self.accumulator / self.dt)
+
+
+class Interpolator:
+    """Рисует спрайты между двумя последними тиками
+
+    snapshot() запоминает позиции перед тиком, apply(alpha) на время
+    рисования ставит спрайты в промежуточные позиции, restore()
+    возвращает настоящие. Спрайты, прыгнувшие дальше max_jump (новая
+    пуля из пула), рисуются там, где они есть.
+    """
+
+    def __init__(self, sprite_lists, max_jump=48):
+        self.sprite_lists = sprite_lists
+        self.max_jump_sq = max_jump * max_jump
+        self.previous = {}
+        self._moved = []
+
+    def snapshot(self):
+        self.previous = {
+            sprite: sprite.position
+            for sprite_list in self.sprite_lists for sprite in sprite_list
+        }
+
+    def apply(self, alpha):
+        previous = self.previous
+        moved = self._moved
+        for sprite_list in self.sprite_lists:
+            for sprite in sprite_list:
+                old = previous.get(sprite)
+                if old is None:
+                    continue
+                x, y = sprite.position
+                dx = x - old[0]
+                dy = y - old[1]
+                if (dx == 0 and dy == 0) or dx * dx + dy * dy > self.max_jump_sq:
+                    continue
+                moved.append((sprite, x, y))
+                sprite.position = (old[0] + dx * alpha, old[1] + dy * alpha)
+
+    def restore(self):
+        for sprite, x, y in self._moved:
+            sprite.position = (x, y)
+        self._moved = []
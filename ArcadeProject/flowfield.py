@@ -0,0 +1,131 @@
+import numpy as np
+
+# Соседи клетки: (dcol, drow). Сначала прямые, потом диагонали -
+# при равной дистанции враг предпочитает идти прямо
+NEIGHBOURS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, 1), (1, -1), (-1, -1))
+UNREACHABLE = np.iinfo(np.int32).max
+
+
+class FlowField:
+    """Общее поле направлений к игроку по сетке тайлов
+
+    Поиск в ширину от клетки игрока считает дистанцию до каждой свободной
+    клетки, после чего для каждой клетки запоминается центр соседней клетки,
+    которая ближе к игроку. Поле перестраивается только когда игрок
+    переходит в другую клетку, а враг узнаёт, куда идти, одним обращением
+    к массиву - сколько бы врагов ни было.
+    """
+
+    def __init__(self, solid, tile_width, tile_height):
+        self.solid = solid
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.height, self.width = solid.shape
+        self.target = None  # (col, row) клетки игрока
+        self.rebuilds = 0
+
+        size = self.width * self.height
+        self.distance = np.full(size, -1, dtype=np.int32)
+        self.next_x = np.zeros(size)  # центр следующей клетки пути
+        self.next_y = np.zeros(size)
+        self.valid = np.zeros(size, dtype=bool)
+
+    def cell_of(self, x, y):
+        return int(x // self.tile_width), int(y // self.tile_height)
+
+    def update(self, x, y):
+        """Перестраивает поле, если игрок сменил клетку. True - если перестроено"""
+        col, row = self.cell_of(x, y)
+        if (col, row) == self.target:
+            return False
+
+        self.target = (col, row)
+        if 0 <= col < self.width and 0 <= row < self.height:
+            self.rebuild(col, row)
+        else:
+            # Игрок за пределами карты - враги идут напрямую
+            self.distance.fill(-1)
+            self.valid.fill(False)
+        return True
+
+    def rebuild(self, col, row):
+        """BFS от клетки (col, row) по свободным клеткам (фронт волны - массивом)"""
+        width, height = self.width, self.height
+        passable = ~self.solid.ravel()
+        distance = self.distance
+        distance.fill(-1)
+        owner = np.empty(width * height, dtype=np.intp)
+
+        start = row * width + col
+        distance[start] = 0
+        frontier = np.array([start], dtype=np.intp)
+        step = 0
+
+        while frontier.size:
+            step += 1
+            cols = frontier % width
+            rows = frontier // width
+            neighbours = np.concatenate((
+                frontier[cols < width - 1] + 1,
+                frontier[cols > 0] - 1,
+                frontier[rows < height - 1] + width,
+                frontier[rows > 0] - width,
+            ))
+            neighbours = neighbours[passable[neighbours] & (distance[neighbours] < 0)]
+
+            # Убираем повторы без сортировки: у клетки остаётся одна "запись"
+            order = np.arange(neighbours.size)
+            owner[neighbours] = order
+            frontier = neighbours[owner[neighbours] == order]
+            distance[frontier] = step
+
+        self.build_directions()
+        self.rebuilds += 1
+
+    def build_directions(self):
+        """Для каждой клетки выбирает соседа с наименьшей дистанцией"""
+        width, height = self.width, self.height
+        grid = self.distance.reshape(height, width)
+
+        # Рамка из недостижимых клеток, чтобы не проверять границы
+        padded = np.full((height + 2, width + 2), UNREACHABLE, dtype=np.int32)
+        padded[1:-1, 1:-1] = np.where(grid >= 0, grid, UNREACHABLE)
+
+        def shifted(dcol, drow):
+            return padded[1 + drow:1 + drow + height, 1 + dcol:1 + dcol + width]
+
+        best = np.where(grid >= 0, grid, UNREACHABLE)
+        best_dcol = np.zeros((height, width), dtype=np.intp)
+        best_drow = np.zeros((height, width), dtype=np.intp)
+
+        for dcol, drow in NEIGHBOURS:
+            candidate = shifted(dcol, drow)
+            if dcol and drow:
+                # По диагонали только если обе прямые клетки свободны (не срезаем углы)
+                open_corner = (shifted(dcol, 0) != UNREACHABLE) & (shifted(0, drow) != UNREACHABLE)
+                candidate = np.where(open_corner, candidate, UNREACHABLE)
+            better = candidate < best
+            best = np.where(better, candidate, best)
+            best_dcol[better] = dcol
+            best_drow[better] = drow
+
+        cols = np.arange(width)[None, :] + best_dcol
+        rows = np.arange(height)[:, None] + best_drow
+        self.next_x[:] = ((cols + 0.5) * self.tile_width).ravel()
+        self.next_y[:] = ((rows + 0.5) * self.tile_height).ravel()
+        # В клетке игрока поля нет; из стены поле выводит к ближайшей свободной клетке
+        self.valid[:] = ((best_dcol != 0) | (best_drow != 0)).ravel()
+
+    def directions(self, xs, ys):
+        """Единичные векторы движения для точек и маска, где поле определено"""
+        cols = np.floor_divide(xs, self.tile_width).astype(np.intp)
+        rows = np.floor_divide(ys, self.tile_height).astype(np.intp)
+        inside = (cols >= 0) & (cols < self.width) & (rows >= 0) & (rows < self.height)
+
+        cells = np.where(inside, rows * self.width + cols, 0)
+        valid = inside & self.valid[cells]
+
+        dx = self.next_x[cells] - xs
+        dy = self.next_y[cells] - ys
+        length = np.maximum(1e-6, np.sqrt(dx * dx + dy * dy))
+        return dx / length, dy / length, valid
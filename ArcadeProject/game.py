@@ -1,9 +1,33 @@
+import startup  # Первым: от него отсчитывается время импорта
+import argparse
 import arcade
+import arcade.shape_list
 import math
 from arcade.future.light import Light, LightLayer
 import random
-from arcade.particles import FadeParticle, Emitter, EmitMaintainCount
 import os
+import time
+import numpy as np
+import pyglet
+from spatial import SpatialHash, overlapping_pairs
+from projectiles import ProjectileSystem
+from pool import ObjectPool
+from entities import EntityRegistry
+from profiler import FrameProfiler
+from assets import AssetManifest, DIRECTIONS
+from preload import AssetPreloader
+from steering import EnemySteering
+from flowfield import FlowField
+import distance_field
+import chunks
+import levelcache
+from lights import LightManager
+from trails import ParticleSystem, ParticleRenderer
+from hud_text import TextCache
+from fixed_step import FixedStep, Interpolator
+from spawning import SpawnIndex, SpawnSlot
+from replay import KEY_DOWN, KEY_UP, SHOOT, UPGRADE, InputRecorder, InputLog, Replayer
+import gamelog
 
 SCREEN_WIDTH = 1000
 SCREEN_HEIGHT = 500
@@ -58,11 +82,49 @@ XP_BOSS = 100
 
 # Другие константы
 SPAWN_INTERVAL = 8.0
+SPAWN_MIN_DISTANCE = 200  # Враги появляются не ближе к игроку...
+SPAWN_MAX_DISTANCE = 800  # ...и не дальше (чуть за краем экрана)
+SPAWN_SEPARATION = 60  # Ближе этого к другому врагу новый враг сдвигается
+SPAWN_NUDGE_ATTEMPTS = 8  # Сколько сдвигов пробовать, прежде чем отказаться от спавна
 ENEMIES_PER_WAVE = 3
 XP_PER_LEVEL = 100
 SKILL_POINTS_PER_LEVEL = 1
 MAX_SKILL_LEVEL = 20
 
+# Порядок характеристик в инвентаре (номер пишется в запись ввода)
+STAT_NAMES = [
+    'health', 'damage', 'speed',
+    'attack_radius', 'reload_speed', 'bullet_speed',
+    'bullet_lifetime'
+]
+
+# Сторона чанка карты в тайлах: спрайты уровня живут только в чанках около камеры
+CHUNK_SIZE = 16
+
+# Фоновая загрузка картинок: сколько текстур доводить до GPU за кадр
+PRELOAD_PER_FRAME = 4
+
+# Свет: бюджет источников на кадр и слияние огней пуль
+MAX_LIGHTS = 48  # Сколько источников света рисуется за кадр
+LIGHT_MERGE_RADIUS = 32  # Огни пуль ближе этого сливаются в один
+
+# Фиксированный шаг симуляции: логика идет тиками, рисование - с интерполяцией
+TICK_RATE = 60  # Тиков симуляции в секунду (не зависит от FPS)
+MAX_CATCH_UP_STEPS = 5  # Сколько тиков максимум догонять за один кадр
+
+# Профайлер: сколько последних кадров учитывать и как часто обновлять оверлей
+PROFILER_WINDOW = 300
+PROFILER_REFRESH = 0.25
+
+# Снаряды дальше этого за краем кадра не двигают спрайт и свет (больше радиуса света пули)
+PROJECTILE_VIEW_MARGIN = 100
+
+# Пулы снарядов
+BULLET_POOL_SIZE = 128
+BULLET_POOL_PREWARM = 32
+ENEMY_BULLET_POOL_SIZE = 512
+ENEMY_BULLET_POOL_PREWARM = 32
+
 # Скорость анимации (кадры в секунду)
 ANIMATION_FPS_BASIC = 2.0
 ANIMATION_FPS_TANK = 2.0
@@ -70,45 +132,28 @@ ANIMATION_FPS_SHOOTER = 2.0
 ANIMATION_FPS_FAST = 1.0
 ANIMATION_FPS_BOSS = 1.0
 
-# Текстуры для частиц
-SPARK_TEX = [
-    arcade.make_soft_circle_texture(10, arcade.color.WHITE_SMOKE),
-    arcade.make_soft_circle_texture(10, arcade.color.WHITE),
-    arcade.make_soft_circle_texture(10, arcade.color.GHOST_WHITE),
-]
+# Кадров анимации у каждого типа врага (FAST и BOSS - статика)
+ENEMY_FRAME_COUNTS = {'BASIC': 2, 'TANK': 2, 'SHOOTER': 2, 'FAST': 1, 'BOSS': 1}
 
+# Журналы по категориям (вывод в фоновом потоке, см. gamelog)
+combat_log = gamelog.get_logger('combat')
+spawn_log = gamelog.get_logger('spawn')
+assets_log = gamelog.get_logger('assets')
+progress_log = gamelog.get_logger('progression')
 
-def make_trail(attached_sprite, maintain=60):
-    """Создаёт эмиттер частиц для следа"""
-    emit = Emitter(
-        center_xy=(attached_sprite.center_x, attached_sprite.center_y),
-        emit_controller=EmitMaintainCount(maintain),
-        particle_factory=lambda e: FadeParticle(
-            filename_or_texture=random.choice(SPARK_TEX),
-            change_xy=arcade.math.rand_in_circle((0.0, 0.0), 3),
-            lifetime=random.uniform(0.35, 0.6),
-            start_alpha=220,
-            end_alpha=0,
-            scale=random.uniform(0.5, 2),
-        ),
-    )
-    emit._attached = attached_sprite
-    return emit
+# Индекс всех текстур игры (папка сканируется один раз при первом запросе)
+ASSETS = AssetManifest("textures")
 
 
 class Player(arcade.Sprite):
     def __init__(self):
-        super().__init__("textures/player_up.png", scale=1.0)
+        textures = ASSETS.player_textures()
+        super().__init__(textures['up'], scale=1.0)
         self.health = 100
         self.max_health = 100
         self.speed = 300
         self.direction = 'down'
-        self.textures = {
-            'up': arcade.load_texture("textures/player_up.png"),
-            'down': arcade.load_texture("textures/player_down.png"),
-            'left': arcade.load_texture("textures/player_left.png"),
-            'right': arcade.load_texture("textures/player_right.png"),
-        }
+        self.textures = textures
         self.texture = self.textures['down']
         self.trail = None
         self.light = None
@@ -156,7 +201,7 @@ class Player(arcade.Sprite):
     def add_xp(self, amount):
         """Добавляет опыт игроку"""
         self.xp += amount
-        print(f"🎯 +{amount} XP! Всего: {self.xp}/{self.xp_to_next_level}")
+        progress_log.info("🎯 +%d XP! Всего: %d/%d", amount, self.xp, self.xp_to_next_level)
 
         while self.xp >= self.xp_to_next_level:
             self.level_up()
@@ -171,9 +216,8 @@ class Player(arcade.Sprite):
         self.max_health += 10
         self.health = min(self.health + 20, self.max_health)
 
-        print(f"🎉 УРОВЕНЬ {self.level}!")
-        print(f"   Очков навыков: {self.skill_points}")
-        print(f"   Макс. здоровье: {self.max_health}")
+        progress_log.info("🎉 УРОВЕНЬ %d! Очков навыков: %d, макс. здоровье: %d",
+                          self.level, self.skill_points, self.max_health)
 
     def upgrade_stat(self, stat_name):
         """Улучшает характеристику"""
@@ -231,48 +275,48 @@ class Player(arcade.Sprite):
 
 
 class EnemyBullet:
-    """Пуля врага (стрелка и босса)"""
+    """Пуля врага (стрелка и босса)
+
+    Движение и попадания считает ProjectileSystem, здесь только визуальная часть.
+    """
+
+    LIGHT_STYLE = ((255, 50, 50), 'soft')  # Цвет и режим света (по ним огни пуль сливаются)
 
     def __init__(self, x, y, direction, damage=10, speed=400):
-        self.x = x
-        self.y = y
         self.radius = 4
-        self.direction = direction
-        self.speed = speed
-        self.damage = damage
-        self.lifetime = 2.0
         self.should_remove = False
 
         try:
-            self.sprite = arcade.Sprite("textures/arrow.png", scale=2)
+            self.sprite = arcade.Sprite(ASSETS.texture("arrow.png"), scale=2)
             self.sprite.color = (255, 0, 0)  # Красный для вражеских пуль
         except:
             bullet_texture = arcade.make_soft_circle_texture(8, (255, 0, 0))
             self.sprite = arcade.Sprite(bullet_texture, scale=2)
 
-        self.sprite.center_x = x
-        self.sprite.center_y = y
-        self.dx = direction[0] * self.speed
-        self.dy = direction[1] * self.speed
-
         # Свет для пули
-        self.light = Light(x, y, 30, (255, 50, 50), 'soft')
-
-    def update(self, delta_time):
-        self.x += self.dx * delta_time
-        self.y += self.dy * delta_time
-        self.lifetime -= delta_time
+        self.light = Light(x, y, 30, *self.LIGHT_STYLE)
 
-        self.sprite.center_x = self.x
-        self.sprite.center_y = self.y
+        self.reset(x, y, direction, damage, speed)
 
-        if self.light:
-            self.light.position = (self.x, self.y)
+    def reset(self, x, y, direction, damage=10, speed=400):
+        """Готовит пулю к (повторному) выстрелу - спрайт и свет не пересоздаются"""
+        self.direction = direction
+        self.speed = speed
+        self.damage = damage
+        self.lifetime = 2.0
+        self.should_remove = False
+        self.dx = direction[0] * self.speed
+        self.dy = direction[1] * self.speed
+        self.move_to(x, y)
 
-        if self.lifetime <= 0:
-            self.should_remove = True
+    def move_to(self, x, y):
+        """Переносит спрайт и свет в позицию из ProjectileSystem"""
+        self.x = x
+        self.y = y
+        self.sprite.position = (x, y)  # Одна запись в SpriteList вместо двух
 
-        return self.should_remove
+        if self.light:
+            self.light.position = (x, y)
 
 
 class Enemy(arcade.Sprite):
@@ -280,6 +324,7 @@ class Enemy(arcade.Sprite):
 
     # Кэш текстур для всех врагов
     _texture_cache = {}
+    _footprint_cache = {}
 
     @classmethod
     def load_enemy_textures(cls, enemy_type):
@@ -287,74 +332,80 @@ class Enemy(arcade.Sprite):
         if enemy_type in cls._texture_cache:
             return cls._texture_cache[enemy_type]
 
-        type_lower = enemy_type.lower()
-        textures = {
-            'up': [],
-            'down': [],
-            'left': [],
-            'right': []
-        }
-
-        # 🔥 ИСПРАВЛЕНИЕ: для FAST и BOSS - 1 кадр, для остальных - 2 кадра
-        if enemy_type in ['FAST', 'BOSS']:
-            frame_count = 1  # 🔥 1 кадр для быстрых и босса (статика)
-        else:
-            frame_count = 2  # 2 кадра для остальных (анимация)
+        # 🔥 для FAST и BOSS - 1 кадр, для остальных - 2 кадра
+        frame_count = ENEMY_FRAME_COUNTS.get(enemy_type, 2)
+        textures = {direction: [] for direction in DIRECTIONS}
+        fallback = None
+        loaded = 0
 
-        print(f"\n🔄 Загрузка текстур для: {enemy_type} (кадров: {frame_count})")
+        for direction in DIRECTIONS:
+            for frame in range(frame_count):
+                # Имя файла берём из индекса - без перебора через исключения
+                texture_path = ASSETS.enemy_path(enemy_type, direction, frame)
+                if texture_path:
+                    textures[direction].append(ASSETS.load(texture_path))
+                    loaded += 1
+                    continue
 
-        # Создаем список всех возможных имен
-        directions = ['up', 'down', 'left', 'right']
+                # Если не нашли файл, создаем резервную текстуру (одну на тип)
+                if fallback is None:
+                    fallback = cls._make_fallback_texture(enemy_type)
+                textures[direction].append(fallback)
 
-        for direction in directions:
-            for frame in range(frame_count):
-                # Пробуем 3 варианта имен
-                names_to_try = [
-                    # 1. Основной вариант: тип_направление_кадр
-                    f"{type_lower}_{direction}_{frame}.png",
-                    # 2. Сокращенный: первые 3 буквы типа
-                    f"{type_lower[:3]}_{direction}_{frame}.png",
-                    # 3. С приставкой enemy_
-                    f"enemy_{type_lower}_{direction}_{frame}.png",
-                    # 4. Без номера кадра (если только 1 кадр)
-                    f"{type_lower}_{direction}.png",
-                    f"{type_lower[:3]}_{direction}.png",
-                    f"enemy_{type_lower}_{direction}.png",
-                ]
-
-                texture_loaded = False
-                for name in names_to_try:
-                    texture_path = f"textures/enemies/{name}"
-                    try:
-                        texture = arcade.load_texture(texture_path)
-                        textures[direction].append(texture)
-                        texture_loaded = True
-                        print(f"✅ Загружено: {name}")
-                        break
-                    except:
-                        continue
-
-                # Если не нашли файл, создаем резервную текстуру
-                if not texture_loaded:
-                    color = cls._get_color_for_type(enemy_type)
-
-                    # Разные размеры для разных врагов
-                    sizes = {
-                        'BASIC': 50,
-                        'TANK': 60,
-                        'SHOOTER': 40,
-                        'FAST': 30,
-                        'BOSS': 80
-                    }
-
-                    size = sizes.get(enemy_type, 50)
-                    temp_texture = arcade.make_soft_square_texture(size, color)
-                    textures[direction].append(temp_texture)
-                    print(f"⚠️ Резервная: для {enemy_type}_{direction}_{frame}")
+        missing = len(DIRECTIONS) * frame_count - loaded
+        assets_log.info("🔄 Текстуры %s: загружено %d, резервных %d", enemy_type, loaded, missing)
 
         cls._texture_cache[enemy_type] = textures
         return textures
 
+    @staticmethod
+    def scale_for(enemy_type):
+        """Масштаб спрайта врага по типу"""
+        if enemy_type == 'TANK':
+            return TANK_SCALE
+        elif enemy_type == 'SHOOTER':
+            return SHOOTER_SCALE
+        elif enemy_type == 'FAST':
+            return FAST_SCALE
+        elif enemy_type == 'BOSS':
+            return BOSS_SCALE
+        return 3.0
+
+    @classmethod
+    def footprint(cls, enemy_type):
+        """Хитбокс врага относительно центра (left, right, bottom, top) - без создания спрайта"""
+        footprint = cls._footprint_cache.get(enemy_type)
+        if footprint is None:
+            points = cls.load_enemy_textures(enemy_type)['down'][0].hit_box_points
+            scale = cls.scale_for(enemy_type)
+            xs = [x * scale for x, _ in points]
+            ys = [y * scale for _, y in points]
+            footprint = cls._footprint_cache[enemy_type] = (min(xs), max(xs), min(ys), max(ys))
+        return footprint
+
+    @classmethod
+    def preload_all_textures(cls):
+        """Загружает текстуры всех типов врагов за один проход по индексу"""
+        for enemy_type in ENEMY_FRAME_COUNTS:
+            cls.load_enemy_textures(enemy_type)
+
+    @classmethod
+    def _make_fallback_texture(cls, enemy_type):
+        """Цветной квадрат вместо отсутствующей текстуры"""
+        color = cls._get_color_for_type(enemy_type)
+
+        # Разные размеры для разных врагов
+        sizes = {
+            'BASIC': 50,
+            'TANK': 60,
+            'SHOOTER': 40,
+            'FAST': 30,
+            'BOSS': 80
+        }
+
+        size = sizes.get(enemy_type, 50)
+        return arcade.make_soft_square_texture(size, color)
+
     @staticmethod
     def _get_color_for_type(enemy_type):
         """Возвращает цвет для врага в зависимости от типа"""
@@ -388,16 +439,7 @@ class Enemy(arcade.Sprite):
         self.set_stats_by_type()
 
         # Масштабируем в зависимости от типа
-        if enemy_type == 'TANK':
-            self.scale = TANK_SCALE
-        elif enemy_type == 'SHOOTER':
-            self.scale = SHOOTER_SCALE
-        elif enemy_type == 'FAST':
-            self.scale = FAST_SCALE
-        elif enemy_type == 'BOSS':
-            self.scale = BOSS_SCALE
-        else:
-            self.scale = 3.0
+        self.scale = self.scale_for(enemy_type)
 
         # Направление и анимация
         self.direction = 'down'
@@ -530,6 +572,7 @@ class Enemy(arcade.Sprite):
         return damage
 
     def update(self, delta_time):
+        """Обновление одного врага (Simulation обновляет всех сразу через EnemySteering)"""
         # Обновляем анимацию
         self.update_animation(delta_time)
 
@@ -597,10 +640,12 @@ class Enemy(arcade.Sprite):
         """Нанесение урона игроку"""
         if self.player.health > 0:
             self.player.health -= self.damage
-            print(f"⚔️ {self.enemy_type} нанес урон {self.damage}! Здоровье: {self.player.health}")
+            combat_log.info("⚔️ %s нанес урон %d! Здоровье: %d",
+                            self.enemy_type, self.damage, self.player.health,
+                            extra={'event': 'удары по игроку'})
 
             if self.player.health <= 0:
-                print("💀 Игрок погиб!")
+                combat_log.warning("💀 Игрок погиб!")
 
     def shoot(self):
         """Стрельба для стрелка и босса"""
@@ -610,72 +655,182 @@ class Enemy(arcade.Sprite):
 
 
 class Bullet:
-    def __init__(self, x, y, direction):
-        self.x = x
-        self.y = y
+    """Пуля игрока (визуальная часть, движение - в ProjectileSystem)"""
+
+    LIGHT_STYLE = (arcade.color.WHITE, 'soft')
+
+    def __init__(self, x, y, direction, particles):
         self.radius = 5
-        self.direction = direction
-        self.speed = 500
-        self.lifetime = 1.5
         self.should_remove = False
 
         try:
-            self.sprite = arcade.Sprite("textures/bullet.png", scale=3)
+            self.sprite = arcade.Sprite(ASSETS.texture("bullet.png"), scale=3)
         except:
             bullet_texture = arcade.make_soft_circle_texture(10, arcade.color.YELLOW)
             self.sprite = arcade.Sprite(bullet_texture, scale=1)
 
-        self.sprite.center_x = x
-        self.sprite.center_y = y
+        self.trail = particles.make_emitter(x, y, maintain=30)
+        self.light = Light(x, y, 50, *self.LIGHT_STYLE)
+
+        self.reset(x, y, direction)
+
+    def reset(self, x, y, direction):
+        """Готовит пулю к (повторному) выстрелу - спрайт, свет и след не пересоздаются"""
+        self.direction = direction
+        self.speed = 500
+        self.damage = 10
+        self.lifetime = 1.5
+        self.should_remove = False
         self.dx = direction[0] * self.speed
         self.dy = direction[1] * self.speed
-        self.trail = make_trail(self.sprite, maintain=30)
-        self.light = Light(x, y, 50, arcade.color.WHITE, 'soft')
 
-    def update(self, delta_time):
-        self.x += self.dx * delta_time
-        self.y += self.dy * delta_time
-        self.lifetime -= delta_time
+        # Старые частицы следа остались бы на месте прошлого выстрела
+        self.trail.clear()
+        self.move_to(x, y)
 
-        self.sprite.center_x = self.x
-        self.sprite.center_y = self.y
-        self.trail.center_x = self.x
-        self.trail.center_y = self.y
+    def move_to(self, x, y):
+        """Переносит спрайт, след и свет в позицию из ProjectileSystem"""
+        self.x = x
+        self.y = y
+        self.sprite.position = (x, y)
+        self.trail.center_x = x
+        self.trail.center_y = y
 
         if self.light:
-            self.light.position = (self.x, self.y)
+            self.light.position = (x, y)
 
-        if self.lifetime <= 0:
-            self.should_remove = True
 
-        return self.should_remove
+class Level:
+    """Уровень: сетки тайлов целиком, спрайты - только чанками около камеры
 
+    Сетки слоев fon, walls и collision, сетка стен и поле расстояний
+    берутся из скомпилированного кэша (levelcache), XML при повторных
+    запусках не разбирается. Спрайты для слоев создаются ChunkStreamer'ом
+    при приближении камеры и выгружаются, когда она уходит далеко, поэтому
+    память и время загрузки не растут с площадью карты. Столкновения вдали
+    от камеры проверяются по сетке solid.
+    """
 
-class Level:
     def __init__(self, map_name):
         try:
-            self.tile_map = arcade.load_tilemap(map_name, scaling=1)
-            self.wall_list = self.tile_map.sprite_lists.get("walls", arcade.SpriteList())
-            self.fon_list = self.tile_map.sprite_lists.get("fon", arcade.SpriteList())
-            self.collision_list = self.tile_map.sprite_lists.get("collision", arcade.SpriteList())
+            compiled = levelcache.load(map_name)
+            self.properties = compiled.properties
+            self.tile_width = compiled.tile_width
+            self.tile_height = compiled.tile_height
+            self.grid_width = compiled.grid_width
+            self.grid_height = compiled.grid_height
+            self.map_width = self.grid_width * self.tile_width
+            self.map_height = self.grid_height * self.tile_height
+
+            # solid[row, col] - строки снизу вверх, как и координаты arcade
+            self.solid = compiled.solid
+            # Поле расстояний до стен и его градиент (для выталкивания врагов)
+            self.sdf = compiled.sdf
+            self.sdf_grad_x = compiled.sdf_grad_x
+            self.sdf_grad_y = compiled.sdf_grad_y
+
+            self.textures = chunks.TileTextures(
+                compiled.tilesets, os.path.dirname(os.path.abspath(map_name))
+            )
+            self.build_layers(compiled.layers)
 
-            self.background = arcade.SpriteList()
-            for sprite in self.fon_list:
-                self.background.append(sprite)
+            assets_log.info("Карта '%s' успешно загружена", map_name)
 
-            self.walls = arcade.SpriteList()
-            for sprite in self.wall_list:
-                self.walls.append(sprite)
+        except Exception as e:
+            assets_log.error("Ошибка загрузки карты %s: %s", map_name, e)
+            raise
 
-            self.collision_sprites = arcade.SpriteList()
-            for sprite in self.collision_list:
-                self.collision_sprites.append(sprite)
+    def build_layers(self, layers):
+        """Слои по чанкам и потоковая загрузка"""
+        args = (self.textures, self.tile_width, self.tile_height, CHUNK_SIZE)
+        self.background = chunks.ChunkedLayer(layers.get("fon"), *args)
+        self.walls = chunks.ChunkedLayer(layers.get("walls"), *args)
+
+        # Стены статичны - пространственный хэш ускоряет проверки и не требует GPU.
+        # В списке только стены загруженных чанков (для физики игрока)
+        self.collision_sprites = arcade.SpriteList(use_spatial_hash=True)
+        collision_layer = chunks.ChunkedLayer(
+            layers.get("collision"), *args, sprite_list=self.collision_sprites
+        )
 
-            print(f"Карта '{map_name}' успешно загружена")
+        self.streamer = chunks.ChunkStreamer(
+            [self.background, self.walls, collision_layer],
+            self.grid_width, self.grid_height, self.tile_width, self.tile_height, CHUNK_SIZE,
+        )
 
-        except Exception as e:
-            print(f"Ошибка загрузки карты {map_name}: {e}")
-            raise
+    def stream(self, left, right, bottom, top, immediate=False):
+        """Подгружает чанки вокруг видимой области и выгружает далекие"""
+        self.streamer.update(left, right, bottom, top)
+        if immediate:
+            self.streamer.flush()
+
+    def wall_push(self, xs, ys, radii):
+        """Векторное выталкивание кругов из стен: смещения (dx, dy) по градиенту поля"""
+        tw, th = self.tile_width, self.tile_height
+        inside = (xs >= 0) & (xs < self.grid_width * tw) & (ys >= 0) & (ys < self.grid_height * th)
+
+        depth = radii - distance_field.sample(self.sdf, xs, ys, tw, th)
+        hit = inside & (depth > 0)
+
+        push_x = np.zeros(len(xs))
+        push_y = np.zeros(len(xs))
+        if hit.any():
+            gx = distance_field.sample(self.sdf_grad_x, xs[hit], ys[hit], tw, th)
+            gy = distance_field.sample(self.sdf_grad_y, xs[hit], ys[hit], tw, th)
+            length = np.maximum(1e-9, np.sqrt(gx * gx + gy * gy))
+            push_x[hit] = gx / length * depth[hit]
+            push_y[hit] = gy / length * depth[hit]
+        return push_x, push_y
+
+    def is_solid_cell(self, col, row):
+        """Есть ли стена в клетке (за пределами карты стен нет)"""
+        if 0 <= col < self.grid_width and 0 <= row < self.grid_height:
+            return bool(self.solid[row, col])
+        return False
+
+    def is_blocked(self, x, y, radius=0):
+        """Задевает ли круг (x, y, radius) хотя бы одну стену - O(1)"""
+        col_start = int((x - radius) // self.tile_width)
+        col_end = int((x + radius) // self.tile_width)
+        row_start = int((y - radius) // self.tile_height)
+        row_end = int((y + radius) // self.tile_height)
+
+        for row in range(row_start, row_end + 1):
+            for col in range(col_start, col_end + 1):
+                if self.is_solid_cell(col, row):
+                    return True
+        return False
+
+    def is_rect_blocked(self, left, right, bottom, top):
+        """Задевает ли прямоугольник хотя бы одну стену (по сетке, без спрайтов)"""
+        col_start = max(0, int(left // self.tile_width))
+        col_end = min(self.grid_width - 1, int((right - 1) // self.tile_width))
+        row_start = max(0, int(bottom // self.tile_height))
+        row_end = min(self.grid_height - 1, int((top - 1) // self.tile_height))
+        if col_start > col_end or row_start > row_end:
+            return False
+        return bool(self.solid[row_start:row_end + 1, col_start:col_end + 1].any())
+
+    def solid_at(self, xs, ys):
+        """Векторная проверка: маска точек, попавших в стену"""
+        cols = np.floor_divide(xs, self.tile_width).astype(np.intp)
+        rows = np.floor_divide(ys, self.tile_height).astype(np.intp)
+        inside = (cols >= 0) & (cols < self.grid_width) & (rows >= 0) & (rows < self.grid_height)
+
+        result = np.zeros(len(xs), dtype=bool)
+        result[inside] = self.solid[rows[inside], cols[inside]]
+        return result
+
+    def blocked_mask(self, xs, ys, radii):
+        """Векторный is_blocked для массива кругов
+
+        Проверяются углы описанного квадрата, поэтому радиус должен быть
+        не больше половины тайла (для пуль это так).
+        """
+        return (self.solid_at(xs - radii, ys - radii) |
+                self.solid_at(xs + radii, ys - radii) |
+                self.solid_at(xs - radii, ys + radii) |
+                self.solid_at(xs + radii, ys + radii))
 
 
 class Inventory:
@@ -687,11 +842,8 @@ class Inventory:
             (150, 200), (300, 200), (450, 200),
             (150, 100), (300, 100), (450, 100),
         ]
-        self.stat_names = [
-            'health', 'damage', 'speed',
-            'attack_radius', 'reload_speed', 'bullet_speed',
-            'bullet_lifetime'
-        ]
+        self.stat_names = STAT_NAMES
+        self.upgrade = player.upgrade_stat  # окно подменяет, чтобы улучшения писались в запись
         self.stat_display_names = {
             'health': '❤️ Здоровье',
             'damage': '⚔️ Урон',
@@ -702,116 +854,115 @@ class Inventory:
             'bullet_lifetime': '⏱️ Дальность'
         }
 
+        # 🔥 Панель рисуется из готовых пакетов, пересобираемых при изменениях
+        self.build_layout()
+        self.shapes = None
+        self.text_batch = None
+        self.labels = {}
+        self._drawn_state = None
+        self.rebuilds = 0
+
     def toggle(self):
         self.visible = not self.visible
         print(f"📦 Инвентарь: {'открыт' if self.visible else 'закрыт'}")
 
+    def build_layout(self):
+        """Прямоугольники карточек и кнопок (left, right, bottom, top) - для рисования и кликов"""
+        self.card_rects = {}
+        self.button_rects = {}
+        for (x, y), stat_name in zip(self.grid_positions, self.stat_names):
+            card_bottom = y - 40
+            self.card_rects[stat_name] = (x - 70, x + 70, card_bottom, y + 40)
+            self.button_rects[stat_name] = (x - 60, x + 60, card_bottom + 5, card_bottom + 25)
+
+    def snapshot(self):
+        """Всё, от чего зависит картинка инвентаря"""
+        player = self.player
+        stats = tuple(
+            (player.stats.get(name, {}).get('bonus', 0), player.stats.get(name, {}).get('cost', 1))
+            for name in self.stat_names
+        )
+        return player.level, player.xp, player.xp_to_next_level, player.skill_points, stats
+
     def draw(self):
+        """Рисует инвентарь, возвращает число вызовов отрисовки"""
         if not self.visible:
-            return
-
-        inventory_top = SCREEN_HEIGHT - 50
-        inventory_bottom = 50
-
-        arcade.draw_lrbt_rectangle_filled(
-            left=50,
-            right=SCREEN_WIDTH - 50,
-            top=inventory_top,
-            bottom=inventory_bottom,
-            color=(30, 30, 40, 230)
-        )
+            return 0
 
-        arcade.draw_lrbt_rectangle_outline(
-            left=50,
-            right=SCREEN_WIDTH - 50,
-            top=inventory_top,
-            bottom=inventory_bottom,
-            color=arcade.color.GOLD,
-            border_width=3
-        )
+        # Пересобираем фигуры и надписи только если что-то поменялось
+        state = self.snapshot()
+        if state != self._drawn_state:
+            self.rebuild()
+            self._drawn_state = state
 
-        arcade.draw_text(
-            "🎮 ПРОКАЧКА ХАРАКТЕРИСТИК",
-            SCREEN_WIDTH // 2, SCREEN_HEIGHT - 80,
-            arcade.color.GOLD, 24,
-            anchor_x="center"
-        )
+        self.shapes.draw()
+        self.text_batch.draw()
+        return 2
 
-        arcade.draw_text(
-            f"Уровень: {self.player.level} | Опыт: {self.player.xp}/{self.player.xp_to_next_level}",
-            SCREEN_WIDTH // 2, SCREEN_HEIGHT - 120,
-            arcade.color.WHITE, 18,
-            anchor_x="center"
-        )
+    def rebuild(self):
+        if self.text_batch is None:
+            self.create_labels()
 
-        arcade.draw_text(
-            f"🎯 Очков навыков: {self.player.skill_points}",
-            SCREEN_WIDTH // 2, SCREEN_HEIGHT - 150,
-            arcade.color.CYAN, 22,
-            anchor_x="center",
-            bold=True
-        )
+        shapes = arcade.shape_list.ShapeElementList()
+        inventory_top = SCREEN_HEIGHT - 50
+        inventory_bottom = 50
+        add_rect(shapes, 50, SCREEN_WIDTH - 50, inventory_bottom, inventory_top, (30, 30, 40, 230))
+        add_rect(shapes, 50, SCREEN_WIDTH - 50, inventory_bottom, inventory_top, arcade.color.GOLD,
+                 border_width=3)
+
+        player = self.player
+        self.labels['level'].text = (f"Уровень: {player.level} | "
+                                     f"Опыт: {player.xp}/{player.xp_to_next_level}")
+        self.labels['points'].text = f"🎯 Очков навыков: {player.skill_points}"
+
+        for stat_name in self.stat_names:
+            self.build_stat_card(shapes, stat_name)
+
+        self.shapes = shapes
+        self.rebuilds += 1
+
+    def create_labels(self):
+        """Надписи создаются один раз, дальше меняются только строки и цвета"""
+        self.text_batch = pyglet.graphics.Batch()
+        batch = self.text_batch
+        self.labels = {
+            'title': arcade.Text(
+                "🎮 ПРОКАЧКА ХАРАКТЕРИСТИК", SCREEN_WIDTH // 2, SCREEN_HEIGHT - 80,
+                arcade.color.GOLD, 24, anchor_x="center", batch=batch
+            ),
+            'level': arcade.Text(
+                "", SCREEN_WIDTH // 2, SCREEN_HEIGHT - 120,
+                arcade.color.WHITE, 18, anchor_x="center", batch=batch
+            ),
+            'points': arcade.Text(
+                "", SCREEN_WIDTH // 2, SCREEN_HEIGHT - 150,
+                arcade.color.CYAN, 22, anchor_x="center", bold=True, batch=batch
+            ),
+        }
 
-        for i, (pos_x, pos_y) in enumerate(self.grid_positions):
-            if i < len(self.stat_names):
-                stat_name = self.stat_names[i]
-                self.draw_stat_card(stat_name, pos_x, pos_y)
+        for stat_name in self.stat_names:
+            left, right, bottom, top = self.card_rects[stat_name]
+            x = (left + right) / 2
+            y = (bottom + top) / 2
+            b_left, b_right, b_bottom, b_top = self.button_rects[stat_name]
+            self.labels[stat_name] = (
+                arcade.Text(self.stat_display_names.get(stat_name, stat_name), x, y + 20,
+                            arcade.color.WHITE, 14, anchor_x="center", anchor_y="center", batch=batch),
+                arcade.Text("", x, y, arcade.color.YELLOW, 18,
+                            anchor_x="center", anchor_y="center", bold=True, batch=batch),
+                arcade.Text("", x, (b_bottom + b_top) / 2, arcade.color.WHITE, 12,
+                            anchor_x="center", anchor_y="center", batch=batch),
+            )
 
-    def draw_stat_card(self, stat_name, x, y):
+    def build_stat_card(self, shapes, stat_name):
         stat = self.player.stats.get(stat_name, {})
         bonus = stat.get('bonus', 0)
         cost = stat.get('cost', 1)
-        display_name = self.stat_display_names.get(stat_name, stat_name)
-
-        card_height = 80
-        half_height = card_height // 2
-        card_top = y + half_height
-        card_bottom = y - half_height
-
-        if card_bottom >= card_top:
-            card_bottom, card_top = card_top, card_bottom
 
+        left, right, bottom, top = self.card_rects[stat_name]
         color = arcade.color.DARK_BLUE_GRAY if bonus < MAX_SKILL_LEVEL else arcade.color.DARK_GREEN
-        arcade.draw_lrbt_rectangle_filled(
-            left=x - 70,
-            right=x + 70,
-            top=card_top,
-            bottom=card_bottom,
-            color=color
-        )
-
-        arcade.draw_lrbt_rectangle_outline(
-            left=x - 70,
-            right=x + 70,
-            top=card_top,
-            bottom=card_bottom,
-            color=arcade.color.WHITE,
-            border_width=2
-        )
-
-        arcade.draw_text(
-            display_name,
-            x, y + 20,
-            arcade.color.WHITE, 14,
-            anchor_x="center",
-            anchor_y="center"
-        )
-
-        arcade.draw_text(
-            f"+{bonus}%",
-            x, y,
-            arcade.color.YELLOW, 18,
-            anchor_x="center",
-            anchor_y="center",
-            bold=True
-        )
-
-        button_height = 20
-        button_top = card_bottom + button_height + 5
-        button_bottom = card_bottom + 5
-
-        if button_bottom >= button_top:
-            button_bottom, button_top = button_top, button_bottom
+        add_rect(shapes, left, right, bottom, top, color)
+        add_rect(shapes, left, right, bottom, top, arcade.color.WHITE, border_width=2)
 
         if bonus < MAX_SKILL_LEVEL and self.player.skill_points >= cost:
             button_color = arcade.color.GREEN
@@ -822,44 +973,38 @@ class Inventory:
             text_color = arcade.color.GRAY
             button_text = "МАКС" if bonus >= MAX_SKILL_LEVEL else f"Нужно {cost}"
 
-        arcade.draw_lrbt_rectangle_filled(
-            left=x - 60,
-            right=x + 60,
-            top=button_top,
-            bottom=button_bottom,
-            color=button_color
-        )
+        add_rect(shapes, *self.button_rects[stat_name], button_color)
 
-        arcade.draw_text(
-            button_text,
-            x, (button_bottom + button_top) / 2,
-            text_color, 12,
-            anchor_x="center",
-            anchor_y="center"
-        )
+        _, bonus_label, button_label = self.labels[stat_name]
+        bonus_label.text = f"+{bonus}%"
+        button_label.text = button_text
+        button_label.color = text_color
 
     def check_click(self, x, y):
         if not self.visible:
             return False
 
-        for i, (pos_x, pos_y) in enumerate(self.grid_positions):
-            if i < len(self.stat_names):
-                card_height = 80
-                half_height = card_height // 2
-                card_bottom = pos_y - half_height
-                button_height = 20
-                button_top = card_bottom + button_height + 5
-                button_bottom = card_bottom + 5
-
-                if (pos_x - 60 <= x <= pos_x + 60 and
-                        button_bottom <= y <= button_top):
-                    stat_name = self.stat_names[i]
-                    if self.player.upgrade_stat(stat_name):
-                        print(f"🔼 Улучшена {stat_name}")
-                    return True
+        for stat_name, (left, right, bottom, top) in self.button_rects.items():
+            if left <= x <= right and bottom <= y <= top:
+                if self.upgrade(stat_name):
+                    print(f"🔼 Улучшена {stat_name}")
+                return True
         return False
 
 
+def add_rect(shapes, left, right, bottom, top, color, border_width=None):
+    """Добавляет прямоугольник (заливка или рамка) в ShapeElementList"""
+    center_x = (left + right) / 2
+    center_y = (bottom + top) / 2
+    if border_width is None:
+        shape = arcade.shape_list.create_rectangle_filled(center_x, center_y, right - left, top - bottom, color)
+    else:
+        shape = arcade.shape_list.create_rectangle_outline(
+            center_x, center_y, right - left, top - bottom, color, border_width
+        )
+    shapes.append(shape)
+
+
 class GameCamera:
     def __init__(self):
         self.camera = arcade.Camera2D()
@@ -872,43 +1017,84 @@ class GameCamera:
     def use(self):
         self.camera.use()
 
+    def viewport(self):
+        """Видимая область мира: (left, right, bottom, top)"""
+        x, y = self.position
+        return (x - SCREEN_WIDTH / 2, x + SCREEN_WIDTH / 2,
+                y - SCREEN_HEIGHT / 2, y + SCREEN_HEIGHT / 2)
 
-class MyGame(arcade.Window):
-    def __init__(self, width, height, title):
-        super().__init__(width, height, title, resizable=False)
 
-        self.game_camera = GameCamera()
-        self.gui_camera = arcade.Camera2D()
+class Simulation:
+    """Вся игровая логика без окна: игрок, враги, пули, уровень и волны
 
-        self.camera_left_bound = 0
-        self.camera_right_bound = 0
-        self.camera_bottom_bound = 0
-        self.camera_top_bound = 0
+    Не зависит от arcade.Window, поэтому её можно шагать из обычного Python
+    с любой частотой (тесты, сервер, CI без дисплея). MyGame только рисует
+    её состояние и передаёт ввод.
+    """
 
-        self.enemy_lights = []
-        self.background_color = arcade.color.BLACK
+    def __init__(self, light_layer=None, effects=True, atlas=None, seed=None):
+        # light_layer=None - свет не рисуется (режим без окна)
+        # effects=False - эмиттеры частиц не обновляются
+        # atlas - куда загружать текстуры во время отсчета (None - без GPU)
+        # seed - зерно всей случайности симуляции (для записи и повтора)
+        self.effects = effects
+        self.atlas = atlas
+        self.preloader = None
 
-        self.light_layer = LightLayer(width, height)
-        self.light_layer.set_background_color(arcade.color.BLACK)
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.tick = 0  # номер текущего тика
 
         self.enemies = arcade.SpriteList()
-        self.enemy_bullets = []  # 🔥 Пули врагов
+        self.enemy_ai = EnemySteering(  # 🔥 ИИ всех врагов одним пакетом
+            ENEMY_TYPES + ['BOSS'],
+            kite_bands={'SHOOTER': (SHOOTER_RANGE - 100, SHOOTER_RANGE)},
+            shoot_ranges={'SHOOTER': SHOOTER_RANGE, 'BOSS': BOSS_RANGE},
+            shoot_cooldowns={'SHOOTER': SHOOTER_COOLDOWN, 'BOSS': BOSS_COOLDOWN},
+        )
+        self.enemy_projectiles = ProjectileSystem()  # 🔥 Пули врагов
         self.enemy_bullet_sprites = arcade.SpriteList()
+        self.enemy_bullet_pool = ObjectPool(
+            lambda: EnemyBullet(0, 0, (0, -1)),
+            max_size=ENEMY_BULLET_POOL_SIZE,
+        )
 
         self.player = Player()
         self.player_list = arcade.SpriteList()
         self.player_list.append(self.player)
 
         self.level = None
+        # 🔥 Игровое поле: карта или экран, что больше (за картой стен нет)
+        self.field_width = SCREEN_WIDTH
+        self.field_height = SCREEN_HEIGHT
+        self.view = None  # Видимая область (ставит окно); None - без окна, синхронизируется всё
         self.physics_engine = None
+        self.flow_field = None  # 🔥 Общий путь к игроку для всех врагов
 
-        self.bullets = []
-        self.bullet_sprites = arcade.SpriteList()
+        # 🔥 Следы: все частицы в одном наборе массивов
         self.emitters = []
+        self.particles = ParticleSystem(self.emitters, seed=self.seed)
+
+        self.player_projectiles = ProjectileSystem()
+        self.bullet_sprites = arcade.SpriteList()
+        self.bullet_pool = ObjectPool(
+            lambda: Bullet(0, 0, (0, -1), self.particles),
+            max_size=BULLET_POOL_SIZE,
+        )
         self.keys_pressed = set()
 
+        # 🔥 РЕЕСТР СУЩНОСТЕЙ: удаление пачкой в конце тика
+        # 🔥 Свет идет через менеджер: отсечение по камере и бюджет
+        self.lights = LightManager(light_layer, max_lights=MAX_LIGHTS, merge_radius=LIGHT_MERGE_RADIUS)
+        self.entities = EntityRegistry(self.lights, self.emitters)
+        self.entities.track('enemies', self.enemies)
+        self.entities.track('bullets', self.bullet_sprites)
+        self.entities.track('enemy_bullets', self.enemy_bullet_sprites)
+
+        # Перезарядка считается в игровом времени, а не через arcade.schedule
         self.can_shoot = True
         self.shoot_cooldown = 0.2
+        self.shoot_timer = 0
 
         # 🔥 СИСТЕМА ВРАГОВ
         self.countdown_time = COUNTDOWN_TIME
@@ -933,40 +1119,83 @@ class MyGame(arcade.Window):
             'BOSS': {'count': 0, 'icon': '👑', 'color': arcade.color.PURPLE}
         }
 
-        self.inventory = None
-        self.inventory_key_pressed = False
-        self.spawn_points = []
+        self.spawn_index = None  # 🔥 Клетки для спавна врагов (строится в setup)
 
-    def spawn_enemy(self, x, y, enemy_type='BASIC'):
-        """Создание врага определенного типа"""
-        # Проверяем что позиция не занята
-        for enemy in self.enemies:
-            if math.sqrt((x - enemy.center_x) ** 2 + (y - enemy.center_y) ** 2) < 60:
-                x += random.randint(-30, 30)
-                y += random.randint(-30, 30)
+        # Замер фаз тика (PhaseTimer) - подключается бенчмарком/профайлером
+        self.timer = None
 
-        # Создаем врага
-        enemy = Enemy(x, y, self.player, enemy_type)
-
-        # Для стреляющих врагов добавляем ссылку на игру
-        if enemy_type in ['SHOOTER', 'BOSS']:
-            enemy.shoot = lambda: self.enemy_shoot(enemy)
-
-        # Проверяем что враг не в стене
-        if self.level:
-            if arcade.check_for_collision_with_list(enemy, self.level.collision_sprites):
-                print(f"⚠️ {enemy_type} спавнится в стене! Пропускаем...")
-                return None
-
-        self.enemies.append(enemy)
-        self.enemy_info[enemy_type]['count'] += 1
-
-        # Добавляем свет
-        if enemy.light:
-            self.light_layer.add(enemy.light)
-            self.enemy_lights.append(enemy.light)
+    def spawn_enemy(self, x, y, enemy_type='BASIC'):
+        """Создание врага определенного типа (None - если место в стене)"""
+        spawned = self.spawn_batch([(x, y, enemy_type)])
+        return spawned[0] if spawned else None
+
+    def spawn_batch(self, composition):
+        """Спавнит пачку врагов: composition - список (x, y, тип). Возвращает созданных
+
+        Сначала проверяются только позиции (find_spawn_position): соседи -
+        и уже живые, и новые из этой же пачки - ищутся по сетке, стены - по
+        сетке уровня с хитбоксом типа. Враги, которым не нашлось места, не
+        создаются. Выжившие добавляются в enemies и свет разом.
+        """
+        occupied = SpatialHash(cell_size=SPAWN_SEPARATION)
+        occupied.rebuild(self.enemies)
+
+        slots = []
+        rejected = 0
+        for x, y, enemy_type in composition:
+            position = self.find_spawn_position(occupied, x, y, enemy_type)
+            if position is None:
+                rejected += 1
+                continue
+
+            slot = SpawnSlot(*position, enemy_type)
+            occupied.insert(slot)
+            slots.append(slot)
+
+        if rejected:
+            spawn_log.warning("⚠️ %d врагам не нашлось места (стены или соседи)! Пропускаем...", rejected)
+
+        enemies = []
+        for slot in slots:
+            enemy = Enemy(slot.center_x, slot.center_y, self.player, slot.enemy_type)
+            # Для стреляющих врагов добавляем ссылку на игру
+            if enemy.enemy_type in ['SHOOTER', 'BOSS']:
+                enemy.shoot = lambda enemy=enemy: self.enemy_shoot(enemy)
+            self.enemy_info[enemy.enemy_type]['count'] += 1
+            enemies.append(enemy)
+
+        # Спрайты и свет добавляются одним пакетом
+        handles = self.entities.spawn_many(enemies, 'enemies', lights=[enemy.light for enemy in enemies])
+        for enemy, handle in zip(enemies, handles):
+            enemy.entity = handle
+        return enemies
+
+    def find_spawn_position(self, occupied, x, y, enemy_type):
+        """Свободная точка возле (x, y) или None
+
+        Точка годится, если ближе SPAWN_SEPARATION нет ни одного врага из
+        occupied, а хитбокс типа не задевает стен. Иначе точка сдвигается
+        случайно (с каждой попыткой дальше) и проверяется заново.
+        """
+        left, right, bottom, top = Enemy.footprint(enemy_type)
+        for attempt in range(SPAWN_NUDGE_ATTEMPTS + 1):
+            if attempt:
+                reach = 30 * attempt
+                nx = x + self.rng.randint(-reach, reach)
+                ny = y + self.rng.randint(-reach, reach)
+            else:
+                nx, ny = x, y
 
-        return enemy
+            # Проверяем что позиция не занята
+            crowded = any(
+                (nx - other.center_x) ** 2 + (ny - other.center_y) ** 2 < SPAWN_SEPARATION ** 2
+                for other in occupied.query(nx, ny, SPAWN_SEPARATION)
+            )
+            # Проверяем что враг не в стене
+            if not crowded and not (self.level and self.level.is_rect_blocked(
+                    nx + left, nx + right, ny + bottom, ny + top)):
+                return nx, ny
+        return None
 
     def enemy_shoot(self, enemy):
         """Стрельба врага (стрелка или босса)"""
@@ -980,46 +1209,68 @@ class MyGame(arcade.Window):
 
             # Настройки пули в зависимости от типа
             if enemy.enemy_type == 'SHOOTER':
-                bullet = EnemyBullet(enemy.center_x, enemy.center_y, direction,
-                                     damage=SHOOTER_DAMAGE, speed=300)
+                self.spawn_enemy_bullet(enemy.center_x, enemy.center_y, direction,
+                                        damage=SHOOTER_DAMAGE, speed=300)
             else:  # BOSS
-                bullet = EnemyBullet(enemy.center_x, enemy.center_y, direction,
-                                     damage=15, speed=350)
+                self.spawn_enemy_bullet(enemy.center_x, enemy.center_y, direction,
+                                        damage=15, speed=350)
 
-            self.enemy_bullets.append(bullet)
-            self.enemy_bullet_sprites.append(bullet.sprite)
-            self.light_layer.add(bullet.light)
+            combat_log.info("🔫 %s стреляет!", enemy.enemy_type, extra={'event': 'выстрелы врагов'})
 
-            print(f"🔫 {enemy.enemy_type} стреляет!")
+    def spawn_enemy_bullet(self, x, y, direction, damage=10, speed=400):
+        """Выпускает вражескую пулю из пула"""
+        bullet = self.enemy_bullet_pool.acquire()
+        bullet.reset(x, y, direction, damage=damage, speed=speed)
+
+        self.enemy_projectiles.spawn(bullet.x, bullet.y, bullet.dx, bullet.dy,
+                                     bullet.lifetime, bullet.damage, bullet.radius, bullet)
+        bullet.entity = self.entities.spawn(
+            bullet, 'enemy_bullets', sprite=bullet.sprite, light=bullet.light,
+            on_destroy=self.enemy_bullet_pool.release, light_style=bullet.LIGHT_STYLE
+        )
+        return bullet
 
     def update_enemy_physics(self, delta_time):
         """Обрабатывает физику врагов"""
-        for i, enemy1 in enumerate(self.enemies):
-            for enemy2 in self.enemies[i + 1:]:
-                dx = enemy1.center_x - enemy2.center_x
-                dy = enemy1.center_y - enemy2.center_y
-                distance = max(1, math.sqrt(dx * dx + dy * dy))
-                min_distance = enemy1.radius + enemy2.radius
-
-                if distance < min_distance:
-                    force = (min_distance - distance) / min_distance
-                    dx_norm = dx / distance
-                    dy_norm = dy / distance
-                    push = force * enemy1.push_force * delta_time
-                    enemy1.center_x += dx_norm * push
-                    enemy1.center_y += dy_norm * push
-                    enemy2.center_x -= dx_norm * push
-                    enemy2.center_y -= dy_norm * push
+        if len(self.enemies) < 2:
+            return
 
-    def setup(self):
-        """Инициализация игры"""
+        sprites = list(self.enemies)
+        n = len(sprites)
+        xs = np.fromiter((enemy.center_x for enemy in sprites), dtype=float, count=n)
+        ys = np.fromiter((enemy.center_y for enemy in sprites), dtype=float, count=n)
+        radii = np.fromiter((enemy.radius for enemy in sprites), dtype=float, count=n)
+
+        # Размер ячейки - диаметр самого большого врага,
+        # тогда все пересекающиеся пары лежат в соседних ячейках
+        first, second, dx, dy, distance_sq = overlapping_pairs(xs, ys, radii, radii.max() * 2)
+        if len(first) == 0:
+            return
+
+        # Все пары толкаются от позиций начала тика, сдвиги суммируются
+        min_distance = radii[first] + radii[second]
+        distance = np.maximum(1, np.sqrt(distance_sq))
+        force = (min_distance - distance) / min_distance
+        push_force = np.fromiter((enemy.push_force for enemy in sprites), dtype=float, count=n)
+        push = force * push_force[first] * delta_time / distance
+        push_x = np.bincount(first, dx * push, n) - np.bincount(second, dx * push, n)
+        push_y = np.bincount(first, dy * push, n) - np.bincount(second, dy * push, n)
+
+        xs += push_x
+        ys += push_y
+        moved = np.flatnonzero(np.bincount(first, minlength=n) + np.bincount(second, minlength=n))
+        for index, x, y in zip(moved.tolist(), xs[moved].tolist(), ys[moved].tolist()):
+            sprites[index].position = (x, y)
+
+    def setup(self, map_name="maps/first_lvl.tmx"):
+        """Загрузка уровня и расстановка игрока"""
         try:
-            self.level = Level("maps/first_lvl.tmx")
+            self.level = Level(map_name)
 
             player_start_x = SCREEN_WIDTH // 2
             player_start_y = SCREEN_HEIGHT // 2
 
-            map_properties = self.level.tile_map.tiled_map.properties
+            map_properties = self.level.properties
             if map_properties:
                 start_x = map_properties.get("player_start_x")
                 start_y = map_properties.get("player_start_y")
@@ -1029,29 +1280,19 @@ class MyGame(arcade.Window):
 
             self.player.center_x = player_start_x
             self.player.center_y = player_start_y
-
-            if hasattr(self.level.tile_map, 'width') and hasattr(self.level.tile_map, 'height'):
-                map_width = self.level.tile_map.width * self.level.tile_map.tile_width
-                map_height = self.level.tile_map.height * self.level.tile_map.tile_height
-
-                self.camera_left_bound = SCREEN_WIDTH // 2
-                self.camera_right_bound = map_width - SCREEN_WIDTH // 2
-                self.camera_bottom_bound = SCREEN_HEIGHT // 2
-                self.camera_top_bound = map_height - SCREEN_HEIGHT // 2
-
-                if map_width < SCREEN_WIDTH:
-                    self.camera_left_bound = map_width // 2
-                    self.camera_right_bound = map_width // 2
-                if map_height < SCREEN_HEIGHT:
-                    self.camera_bottom_bound = map_height // 2
-                    self.camera_top_bound = map_height // 2
+            self.stream_level(immediate=True)
 
             self.physics_engine = arcade.PhysicsEngineSimple(
-                self.player, self.level.collision_list
+                self.player, self.level.collision_sprites
+            )
+            self.flow_field = FlowField(
+                self.level.solid, self.level.tile_width, self.level.tile_height
             )
 
-            self.player.trail = make_trail(self.player, maintain=60)
-            self.emitters.append(self.player.trail)
+            self.player.trail = self.particles.make_emitter(
+                self.player.center_x, self.player.center_y, maintain=60
+            )
+            self.entities.emitters.add(self.player.trail)
 
             self.player.light = Light(
                 self.player.center_x,
@@ -1060,7 +1301,12 @@ class MyGame(arcade.Window):
                 arcade.color.WHITE,
                 'soft'
             )
-            self.light_layer.add(self.player.light)
+            self.entities.attach_light(self.player.light, 'player')
+
+            # Текстуры врагов, пуль и интерфейса грузятся в фоне во время отсчета
+            self.preloader = AssetPreloader(
+                ASSETS, ASSETS.image_paths(), per_frame=PRELOAD_PER_FRAME, atlas=self.atlas
+            ).start()
 
             print("Игра успешно инициализирована")
 
@@ -1069,41 +1315,35 @@ class MyGame(arcade.Window):
             self.countdown_text = "5"
             self.game_started = False
 
-            self.inventory = Inventory(self.player)
-
         except Exception as e:
             print(f"Ошибка в setup(): {e}")
             raise
 
-        self.create_spawn_points()
-
-    def create_spawn_points(self):
-        """Создает безопасные точки для спавна врагов"""
-        self.spawn_points = []
-        for _ in range(20):
-            x = random.randint(100, SCREEN_WIDTH - 100)
-            y = random.randint(100, SCREEN_HEIGHT - 100)
-            safe = True
-
-            if self.level:
-                temp = arcade.SpriteSolidColor(50, 50, arcade.color.TRANSPARENT_BLACK)
-                temp.center_x = x
-                temp.center_y = y
-                if arcade.check_for_collision_with_list(temp, self.level.collision_sprites):
-                    safe = False
+        self.build_spawn_index()
 
-            if math.sqrt((x - self.player.center_x) ** 2 + (y - self.player.center_y) ** 2) < 200:
-                safe = False
-
-            if safe:
-                self.spawn_points.append((x, y))
+    def build_spawn_index(self):
+        """Индекс клеток для спавна врагов (строится один раз на уровень)"""
+        level = self.level
+        self.field_width = max(level.map_width, SCREEN_WIDTH)
+        self.field_height = max(level.map_height, SCREEN_HEIGHT)
+        self.spawn_index = SpawnIndex(
+            level.solid, level.tile_width, level.tile_height, self.field_width, self.field_height,
+        )
+        spawn_log.info("✅ Клеток для спавна врагов: %d", len(self.spawn_index))
 
-        print(f"✅ Создано {len(self.spawn_points)} точек для спавна врагов")
+    def spawn_band(self):
+        """Клетки на расстоянии SPAWN_MIN..SPAWN_MAX_DISTANCE от игрока (отрезок индекса)"""
+        x, y = self.player.center_x, self.player.center_y
+        band = self.spawn_index.band(x, y, SPAWN_MIN_DISTANCE, SPAWN_MAX_DISTANCE)
+        if band[0] >= band[1]:
+            # Рядом места нет - подойдет любая клетка подальше от игрока
+            band = self.spawn_index.band(x, y, SPAWN_MIN_DISTANCE)
+        return band
 
     def spawn_wave(self):
         """Спавнит волну врагов разных типов"""
         if len(self.enemies) >= self.max_enemies:
-            print("⚠️ Достигнут максимум врагов!")
+            spawn_log.warning("⚠️ Достигнут максимум врагов!")
             return
 
         # 🔥 РАСЧЕТ ВОЛНЫ
@@ -1116,21 +1356,25 @@ class MyGame(arcade.Window):
 
         self.current_wave_enemies = enemies_to_spawn
         self.wave_cleared = False
+        spawn_band = self.spawn_band()
+        composition = []  # (x, y, тип) - вся волна создается одним spawn_batch
 
         # 🔥 СПАВН БОССА КАЖДУЮ 5-Ю ВОЛНУ
         if self.wave_number % BOSS_SPAWN_WAVE == 0 and self.wave_number > 1:
-            print(f"👑 БОСС ВОЛНА #{self.wave_number // BOSS_SPAWN_WAVE}")
+            spawn_log.info("👑 БОСС ВОЛНА #%d", self.wave_number // BOSS_SPAWN_WAVE)
             # Спавним одного босса вместо обычных врагов
-            if self.spawn_points:
-                x, y = random.choice(self.spawn_points)
-                self.spawn_enemy(x, y, 'BOSS')
+            point = self.spawn_index.pick(self.rng, spawn_band)
+            if point:
+                x, y = point
+                composition.append((x, y, 'BOSS'))
                 enemies_to_spawn -= 1
-                print("🔥 Появился БОСС!")
+                spawn_log.info("🔥 Появился БОСС!")
 
         # 🔥 РАСПРЕДЕЛЕНИЕ ТИПОВ ВРАГОВ
         for i in range(enemies_to_spawn):
-            if self.spawn_points:
-                x, y = random.choice(self.spawn_points)
+            point = self.spawn_index.pick(self.rng, spawn_band)
+            if point:
+                x, y = point
 
                 # Выбираем тип врага в зависимости от номера волны
                 if self.wave_number < 3:
@@ -1138,79 +1382,72 @@ class MyGame(arcade.Window):
                     enemy_type = 'BASIC'
                 elif self.wave_number < 5:
                     # Волны 3-4 - добавляем быстрых
-                    enemy_type = random.choice(['BASIC', 'FAST'])
+                    enemy_type = self.rng.choice(['BASIC', 'FAST'])
                 elif self.wave_number < 8:
                     # Волны 5-7 - добавляем стрелков
-                    enemy_type = random.choice(['BASIC', 'FAST', 'SHOOTER'])
+                    enemy_type = self.rng.choice(['BASIC', 'FAST', 'SHOOTER'])
                 else:
                     # Волны 8+ - все типы кроме босса
-                    enemy_type = random.choice(['BASIC', 'FAST', 'SHOOTER', 'TANK'])
+                    enemy_type = self.rng.choice(['BASIC', 'FAST', 'SHOOTER', 'TANK'])
 
-                self.spawn_enemy(x, y, enemy_type)
+                composition.append((x, y, enemy_type))
             else:
-                # Если точек нет - спавним по краям
-                side = random.choice(['top', 'bottom', 'left', 'right'])
+                # Если клеток нет (вся карта в стенах) - спавним по краям
+                side = self.rng.choice(['top', 'bottom', 'left', 'right'])
                 if side == 'top':
-                    x = random.randint(0, SCREEN_WIDTH)
-                    y = SCREEN_HEIGHT + 50
+                    x = self.rng.randint(0, self.field_width)
+                    y = self.field_height + 50
                 elif side == 'bottom':
-                    x = random.randint(0, SCREEN_WIDTH)
+                    x = self.rng.randint(0, self.field_width)
                     y = -50
                 elif side == 'left':
                     x = -50
-                    y = random.randint(0, SCREEN_HEIGHT)
+                    y = self.rng.randint(0, self.field_height)
                 else:
-                    x = SCREEN_WIDTH + 50
-                    y = random.randint(0, SCREEN_HEIGHT)
-
-                enemy_type = random.choice(ENEMY_TYPES) if self.wave_number > 2 else 'BASIC'
-                self.spawn_enemy(x, y, enemy_type)
-
-        print(f"🌊 Волна {self.wave_number}: {enemies_to_spawn} врагов")
-        print(f"   Типы: Базовые={self.enemy_info['BASIC']['count']}, "
-              f"Танки={self.enemy_info['TANK']['count']}, "
-              f"Стрелки={self.enemy_info['SHOOTER']['count']}, "
-              f"Быстрые={self.enemy_info['FAST']['count']}, "
-              f"Босс={self.enemy_info['BOSS']['count']}")
-        self.wave_number += 1
+                    x = self.field_width + 50
+                    y = self.rng.randint(0, self.field_height)
 
-    def on_key_press(self, key, modifiers):
-        self.keys_pressed.add(key)
-        if key == arcade.key.TAB or key == arcade.key.I:
-            if not self.inventory_key_pressed:
-                self.inventory.toggle()
-                self.inventory_key_pressed = True
+                enemy_type = self.rng.choice(ENEMY_TYPES) if self.wave_number > 2 else 'BASIC'
+                composition.append((x, y, enemy_type))
 
-    def on_key_release(self, key, modifiers):
-        if key in self.keys_pressed:
-            self.keys_pressed.remove(key)
-        if key == arcade.key.TAB or key == arcade.key.I:
-            self.inventory_key_pressed = False
+        self.spawn_batch(composition)
 
-    def on_mouse_press(self, x, y, button, modifiers):
-        if button == arcade.MOUSE_BUTTON_LEFT and self.can_shoot and not self.countdown_active:
+        info = self.enemy_info
+        spawn_log.info("🌊 Волна %d: %d врагов. Типы: Базовые=%d, Танки=%d, Стрелки=%d, Быстрые=%d, Босс=%d",
+                       self.wave_number, enemies_to_spawn, info['BASIC']['count'], info['TANK']['count'],
+                       info['SHOOTER']['count'], info['FAST']['count'], info['BOSS']['count'])
+        self.wave_number += 1
+
+    def try_shoot(self):
+        """Выстрел игрока, если оружие перезаряжено и отсчет закончился"""
+        if self.can_shoot and not self.countdown_active:
             self.shoot()
             self.can_shoot = False
-            arcade.schedule(self.weapon_ready, self.shoot_cooldown)
+            self.shoot_timer = self.shoot_cooldown
+            return True
+        return False
 
-        if button == arcade.MOUSE_BUTTON_LEFT:
-            if self.inventory and self.inventory.check_click(x, y):
-                return
+    def update_weapon(self, delta_time):
+        if not self.can_shoot:
+            self.shoot_timer -= delta_time
+            if self.shoot_timer <= 0:
+                self.can_shoot = True
 
-    def weapon_ready(self, delta_time):
-        self.can_shoot = True
-        arcade.unschedule(self.weapon_ready)
+    def update_emitters(self, delta_time):
+        if not self.effects:
+            return
+        self.particles.update(delta_time)
 
     def shoot(self):
         """Создание пули игрока"""
-        bullet = Bullet(self.player.center_x, self.player.center_y, self.player.shoot_direction)
-        self.bullets.append(bullet)
-        self.bullet_sprites.append(bullet.sprite)
-        self.emitters.append(bullet.trail)
-        self.light_layer.add(bullet.light)
-
-    def update_camera(self):
-        self.game_camera.center(self.player.center_x, self.player.center_y)
+        bullet = self.bullet_pool.acquire()
+        bullet.reset(self.player.center_x, self.player.center_y, self.player.shoot_direction)
+        self.player_projectiles.spawn(bullet.x, bullet.y, bullet.dx, bullet.dy,
+                                      bullet.lifetime, bullet.damage, bullet.radius, bullet)
+        bullet.entity = self.entities.spawn(
+            bullet, 'bullets', sprite=bullet.sprite, light=bullet.light, emitter=bullet.trail,
+            on_destroy=self.bullet_pool.release, light_style=bullet.LIGHT_STYLE
+        )
 
     def update_player_movement(self, delta_time):
         dx, dy = 0, 0
@@ -1243,10 +1480,157 @@ class MyGame(arcade.Window):
         if self.player.light:
             self.player.light.position = (self.player.center_x, self.player.center_y)
 
-    def on_update(self, delta_time):
+    def update_enemy_projectiles(self, delta_time):
+        """Двигает вражеские пули и проверяет попадания в игрока пачкой"""
+        projectiles = self.enemy_projectiles
+        expired = projectiles.step(delta_time)
+
+        # Проверка попадания в игрока
+        hit_player = projectiles.hits_circle(
+            self.player.center_x, self.player.center_y, self.player.width / 2
+        )
+        for index in np.flatnonzero(hit_player):
+            damage = int(projectiles.damage[index])
+            self.player.health -= damage
+            combat_log.info("💥 Игрок получил %d урона от вражеской пули! Здоровье: %d",
+                            damage, self.player.health, extra={'event': 'попадания по игроку'})
+
+        for bullet in projectiles.compact(expired | hit_player):
+            self.entities.destroy(bullet.entity)
+
+        self.sync_projectiles(projectiles)
+
+    def sync_projectiles(self, projectiles):
+        """Переносит позиции пуль в спрайты; пули далеко за кадром скрываются"""
+        entered, gone = projectiles.sync_handles(self.view, PROJECTILE_VIEW_MARGIN)
+        for bullet in gone:
+            self.entities.set_shown(bullet.entity, False)
+        for bullet in entered:
+            self.entities.set_shown(bullet.entity, True)
+
+    def update_player_projectiles(self, delta_time):
+        """Двигает пули игрока и проверяет стены и врагов пачкой"""
+        projectiles = self.player_projectiles
+        expired = projectiles.step(delta_time)
+        n = projectiles.count
+
+        # Столкновение со стенами
+        if self.level and n:
+            hit_wall = self.level.blocked_mask(
+                projectiles.x[:n], projectiles.y[:n], projectiles.radius[:n]
+            )
+        else:
+            hit_wall = np.zeros(n, dtype=bool)
+
+        # Столкновение с врагами
+        enemies = list(self.enemies)
+        enemy_count = len(enemies)
+        enemy_x = np.fromiter((enemy.center_x for enemy in enemies), dtype=float, count=enemy_count)
+        enemy_y = np.fromiter((enemy.center_y for enemy in enemies), dtype=float, count=enemy_count)
+        enemy_r = np.fromiter((enemy.width / 2 for enemy in enemies), dtype=float, count=enemy_count)
+        first_hit = projectiles.first_hits(enemy_x, enemy_y, enemy_r)
+
+        hit_enemy = np.zeros(n, dtype=bool)
+        killed = set()
+        for index in np.flatnonzero(first_hit >= 0):
+            enemy = enemies[first_hit[index]]
+            if enemy in killed:
+                # Враг уже убит другой пулей в этом кадре - пуля летит дальше
+                continue
+
+            hit_enemy[index] = True
+            enemy.take_damage(int(projectiles.damage[index]))
+
+            if enemy.health <= 0:
+                killed.add(enemy)
+                self.entities.destroy(enemy.entity)
+                self.enemy_info[enemy.enemy_type]['count'] -= 1
+                enemy.die(self)
+                combat_log.info("💀 %s уничтожен!", enemy.enemy_type, extra={'event': 'убито врагов'})
+
+        for bullet in projectiles.compact(expired | hit_wall | hit_enemy):
+            self.entities.destroy(bullet.entity)
+
+        self.sync_projectiles(projectiles)
+
+    def resolve_enemy_walls(self):
+        """Держит врагов в пределах игрового поля и выталкивает из стен (для всех сразу)"""
+        n = len(self.enemies)
+        if n == 0:
+            return
+
+        sprites = list(self.enemies)
+        xs = np.fromiter((enemy.center_x for enemy in sprites), dtype=float, count=n)
+        ys = np.fromiter((enemy.center_y for enemy in sprites), dtype=float, count=n)
+        np.clip(xs, 50, self.field_width - 50, out=xs)
+        np.clip(ys, 50, self.field_height - 50, out=ys)
+
+        if self.level:
+            radii = np.fromiter((enemy.radius for enemy in sprites), dtype=float, count=n)
+            push_x, push_y = self.level.wall_push(xs, ys, radii)
+            xs += push_x
+            ys += push_y
+
+        for enemy, x, y in zip(sprites, xs.tolist(), ys.tolist()):
+            enemy.position = (x, y)
+
+    @property
+    def preload_progress(self):
+        """Доля загруженных текстур (для экрана отсчета)"""
+        return self.preloader.progress if self.preloader else 1.0
+
+    def finish_preload(self):
+        """Догружает то, что не успело за отсчет, и собирает текстуры врагов"""
+        if self.preloader:
+            self.preloader.finish()
+            for path, error in self.preloader.failed:
+                assets_log.warning("⚠️ Не удалось загрузить %s: %s", path, error)
+        Enemy.preload_all_textures()
+        self.warm_pools(None)
+
+    def warm_pools(self, budget=PRELOAD_PER_FRAME):
+        """Заполняет пулы пуль заранее, не больше budget объектов за вызов (None - все сразу)
+
+        Пули (спрайт, текстура, свет, след) создаются во время отсчета, а не
+        в конструкторе: так первый кадр появляется раньше.
+        """
+        for pool, target in ((self.bullet_pool, BULLET_POOL_PREWARM),
+                             (self.enemy_bullet_pool, ENEMY_BULLET_POOL_PREWARM)):
+            if budget is None:
+                pool.prewarm(target)
+            else:
+                budget -= pool.prewarm(min(target, len(pool.free) + budget))
+
+    def apply_input(self, kind, value=0):
+        """Ввод игрока в виде события (так его пишет и повторяет replay)"""
+        if kind == KEY_DOWN:
+            self.keys_pressed.add(value)
+        elif kind == KEY_UP:
+            self.keys_pressed.discard(value)
+        elif kind == SHOOT:
+            return self.try_shoot()
+        elif kind == UPGRADE:
+            return self.player.upgrade_stat(STAT_NAMES[value])
+
+    def stream_level(self, immediate=False):
+        """Чанки карты вокруг игрока (камера всегда по центру на нем)"""
+        if self.level:
+            x, y = self.player.center_x, self.player.center_y
+            self.level.stream(x - SCREEN_WIDTH / 2, x + SCREEN_WIDTH / 2,
+                              y - SCREEN_HEIGHT / 2, y + SCREEN_HEIGHT / 2, immediate)
+
+    def step(self, delta_time):
+        """Один тик симуляции"""
+        self.tick += 1
+        self.stream_level()
+        self.update_weapon(delta_time)
+
         # 🔥 ОТСЧЕТ
         if self.countdown_active:
             self.countdown_time -= delta_time
+            if self.preloader:
+                self.preloader.update()
+            self.warm_pools()
 
             if self.countdown_time > 0:
                 seconds = int(self.countdown_time) + 1
@@ -1257,26 +1641,30 @@ class MyGame(arcade.Window):
                 self.countdown_active = False
                 self.countdown_text = "СТАРТ!"
                 self.game_started = True
-                print("🚀 Игра началась!")
+                self.finish_preload()
+                progress_log.info("🚀 Игра началась!")
                 self.spawn_wave()
 
             self.update_player_movement(delta_time)
-            self.update_camera()
-
-            for emitter in self.emitters:
-                emitter.update()
+            self.update_emitters(delta_time)
             return
 
         if not self.game_started:
             return
 
+        timer = self.timer
+        if timer:
+            timer.begin()
+
         # 🔥 ОБНОВЛЕНИЕ ИГРОКА
         self.update_player_movement(delta_time)
+        if timer:
+            timer.lap('player_movement')
 
         # 🔥 ВОЛНЫ
         if not self.wave_cleared and len(self.enemies) == 0:
             self.wave_cleared = True
-            print(f"✅ Волна зачищена! Следующая волна через {self.spawn_interval} секунд")
+            progress_log.info("✅ Волна зачищена! Следующая волна через %s секунд", self.spawn_interval)
             self.spawn_timer = 0
 
         if self.wave_cleared:
@@ -1284,152 +1672,332 @@ class MyGame(arcade.Window):
             if self.spawn_timer >= self.spawn_interval:
                 self.spawn_wave()
                 self.spawn_timer = 0
+        if timer:
+            timer.lap('waves')
 
         # 🔥 ОБНОВЛЕНИЕ ВРАГОВ
-        self.enemies.update(delta_time)
+        if self.flow_field:
+            self.flow_field.update(self.player.center_x, self.player.center_y)
+            if timer:
+                timer.lap('flow_field')
+
+        self.enemy_ai.update(self.enemies, self.player, delta_time, self.flow_field)
+        if timer:
+            timer.lap('enemies_update')
+
         self.update_enemy_physics(delta_time)
+        if timer:
+            timer.lap('enemy_physics')
 
         # 🔥 ОБНОВЛЕНИЕ ВРАЖЕСКИХ ПУЛЬ
-        enemy_bullets_to_remove = []
-        for bullet in self.enemy_bullets[:]:
-            should_remove = bullet.update(delta_time)
-
-            # Проверка попадания в игрока
-            distance = math.sqrt(
-                (bullet.sprite.center_x - self.player.center_x) ** 2 +
-                (bullet.sprite.center_y - self.player.center_y) ** 2
-            )
-            if distance < bullet.radius + self.player.width / 2:
-                self.player.health -= bullet.damage
-                print(f"💥 Игрок получил {bullet.damage} урона от вражеской пули! Здоровье: {self.player.health}")
-                should_remove = True
-
-            if should_remove:
-                enemy_bullets_to_remove.append(bullet)
-
-        for bullet in enemy_bullets_to_remove:
-            if bullet.light in self.light_layer._lights:
-                self.light_layer.remove(bullet.light)
-            if bullet.sprite in self.enemy_bullet_sprites:
-                self.enemy_bullet_sprites.remove(bullet.sprite)
-            if bullet in self.enemy_bullets:
-                self.enemy_bullets.remove(bullet)
+        self.update_enemy_projectiles(delta_time)
+        if timer:
+            timer.lap('enemy_projectiles')
 
         # 🔥 ПРОВЕРКА ГРАНИЦ И СТЕН
-        for enemy in self.enemies[:]:
-            if enemy.center_x < 50:
-                enemy.center_x = 50
-            elif enemy.center_x > SCREEN_WIDTH - 50:
-                enemy.center_x = SCREEN_WIDTH - 50
-
-            if enemy.center_y < 50:
-                enemy.center_y = 50
-            elif enemy.center_y > SCREEN_HEIGHT - 50:
-                enemy.center_y = SCREEN_HEIGHT - 50
-
-            if self.level:
-                wall_collisions = arcade.check_for_collision_with_list(enemy, self.level.collision_sprites)
-                if wall_collisions:
-                    for wall in wall_collisions:
-                        dx = enemy.center_x - wall.center_x
-                        dy = enemy.center_y - wall.center_y
-                        dist = max(1, math.sqrt(dx * dx + dy * dy))
-                        enemy.center_x += (dx / dist) * 5
-                        enemy.center_y += (dy / dist) * 5
+        self.resolve_enemy_walls()
+        if timer:
+            timer.lap('enemy_walls')
 
         # 🔥 ПУЛИ ИГРОКА
-        bullets_to_remove = []
-        for bullet in self.bullets[:]:
-            should_remove = bullet.update(delta_time)
-
-            # Столкновение со стенами
-            bullet_hit_wall = False
-            if self.level:
-                for wall in self.level.collision_sprites:
-                    distance = math.sqrt(
-                        (bullet.sprite.center_x - wall.center_x) ** 2 +
-                        (bullet.sprite.center_y - wall.center_y) ** 2
-                    )
-                    if distance < bullet.radius + wall.width / 2:
-                        bullet_hit_wall = True
-                        break
-
-            # Столкновение с врагами
-            bullet_hit_enemy = False
-            for enemy in self.enemies[:]:
-                distance = math.sqrt(
-                    (bullet.sprite.center_x - enemy.center_x) ** 2 +
-                    (bullet.sprite.center_y - enemy.center_y) ** 2
-                )
-                enemy_radius = enemy.width / 2 if hasattr(enemy, 'width') else 15
-                if distance < bullet.radius + enemy_radius:
-                    bullet_hit_enemy = True
-                    damage_dealt = enemy.take_damage(10)  # Базовый урон 10
-
-                    if enemy.health <= 0:
-                        self.enemies.remove(enemy)
-                        self.enemy_info[enemy.enemy_type]['count'] -= 1
-                        if enemy.light in self.light_layer._lights:
-                            self.light_layer.remove(enemy.light)
-                        enemy.die(self)
-                        print(f"💀 {enemy.enemy_type} уничтожен!")
-                    break
-
-            if should_remove or bullet_hit_wall or bullet_hit_enemy:
-                bullets_to_remove.append(bullet)
-
-        for bullet in bullets_to_remove:
-            if bullet.trail in self.emitters:
-                self.emitters.remove(bullet.trail)
-            if bullet.light in self.light_layer._lights:
-                self.light_layer.remove(bullet.light)
-            if bullet.sprite in self.bullet_sprites:
-                self.bullet_sprites.remove(bullet.sprite)
-            if bullet in self.bullets:
-                self.bullets.remove(bullet)
+        self.update_player_projectiles(delta_time)
+        if timer:
+            timer.lap('player_projectiles')
 
         # 🔥 ЭМИТТЕРЫ
-        for emitter in self.emitters:
-            emitter.update()
+        self.update_emitters(delta_time)
+        if timer:
+            timer.lap('emitters')
+
+        # 🔥 УДАЛЕНИЕ МЁРТВЫХ СУЩНОСТЕЙ (пачкой)
+        self.entities.flush()
+        if timer:
+            timer.lap('flush')
+            timer.end_frame()
 
         # 🔥 ПРОВЕРКА СМЕРТИ ИГРОКА
         if self.player.health <= 0 and self.game_started:
-            print("💀 ИГРА ОКОНЧЕНА!")
+            progress_log.warning("💀 ИГРА ОКОНЧЕНА!")
             self.game_started = False
             # Здесь можно добавить экран Game Over
 
-        self.update_camera()
+
+class MyGame(arcade.Window):
+    """Окно игры: рисует состояние Simulation и передаёт ей ввод"""
+
+    def __init__(self, width, height, title, record_path=None, replay_path=None, startup_report=None):
+        super().__init__(width, height, title, resizable=False)
+
+        self.game_camera = GameCamera()
+        self.gui_camera = arcade.Camera2D()
+
+        self.camera_left_bound = 0
+        self.camera_right_bound = 0
+        self.camera_bottom_bound = 0
+        self.camera_top_bound = 0
+
+        self.background_color = arcade.color.BLACK
+
+        self.light_layer = LightLayer(width, height)
+        self.light_layer.set_background_color(arcade.color.BLACK)
+        startup.timer.mark('window')
+        self.startup_report = startup_report
+        self.first_frame_drawn = False
+        self.startup_reported = False
+
+        # 🔥 ЗАПИСЬ И ПОВТОР: при повторе зерно и карта берутся из записи
+        self.replay_log = InputLog.load(replay_path) if replay_path else None
+        self.record_path = record_path
+        self.recorder = None
+        self.replayer = None
+        seed = self.replay_log.seed if self.replay_log else None
+
+        self.sim = Simulation(self.light_layer, atlas=self.ctx.default_atlas, seed=seed)
+        self.particle_renderer = ParticleRenderer(self.ctx, self.sim.particles)
+        startup.timer.mark('simulation')
+
+        # 🔥 Фиксированный шаг симуляции + интерполяция спрайтов при рисовании
+        self.fixed_step = FixedStep(TICK_RATE, MAX_CATCH_UP_STEPS)
+        self.interpolator = Interpolator([
+            self.sim.player_list, self.sim.enemies,
+            self.sim.bullet_sprites, self.sim.enemy_bullet_sprites,
+        ])
+
+        # 🔥 Надписи HUD и отсчета: перестраиваются только при изменении
+        self.hud_labels = TextCache()
+        self.countdown_labels = TextCache()
+
+        self.inventory = None
+        self.inventory_key_pressed = False
+
+        # 🔥 ПРОФАЙЛЕР (F3 - оверлей, F4 - сохранить гистограмму кадров)
+        self.profiler = FrameProfiler(window=PROFILER_WINDOW)
+        self.profiler_text = None  # Создается при первом включении (F3)
+        self.profiler_refresh = 0
+        self.draw_calls = 0  # Вызовы отрисовки за последний кадр
+
+    def setup(self):
+        """Инициализация игры"""
+        map_name = self.replay_log.map_name if self.replay_log else "maps/first_lvl.tmx"
+        self.sim.setup(map_name)
+        level = self.sim.level
+
+        if self.replay_log:
+            self.replayer = Replayer(self.replay_log, self.sim)
+            print(f"▶️ Повтор записи: {self.replay_log.duration:.1f} с, зерно {self.sim.seed}")
+        elif self.record_path:
+            self.recorder = InputRecorder(self.record_path, self.sim.seed, TICK_RATE, map_name)
+            print(f"⏺️ Запись ввода в {self.record_path}, зерно {self.sim.seed}")
+
+        if level:
+            map_width = level.map_width
+            map_height = level.map_height
+
+            self.camera_left_bound = SCREEN_WIDTH // 2
+            self.camera_right_bound = map_width - SCREEN_WIDTH // 2
+            self.camera_bottom_bound = SCREEN_HEIGHT // 2
+            self.camera_top_bound = map_height - SCREEN_HEIGHT // 2
+
+            if map_width < SCREEN_WIDTH:
+                self.camera_left_bound = map_width // 2
+                self.camera_right_bound = map_width // 2
+            if map_height < SCREEN_HEIGHT:
+                self.camera_bottom_bound = map_height // 2
+                self.camera_top_bound = map_height // 2
+
+        self.inventory = Inventory(self.sim.player)
+        self.inventory.upgrade = self.upgrade_stat
+        startup.timer.mark('map')
+
+    def send_input(self, kind, value=0):
+        """Ввод, влияющий на симуляцию: пишется в запись и применяется на текущем тике"""
+        if self.replayer:
+            return False  # Во время повтора симуляцией управляет запись
+        if self.recorder:
+            self.recorder.record(self.sim.tick, kind, value)
+        return self.sim.apply_input(kind, value)
+
+    def upgrade_stat(self, stat_name):
+        return self.send_input(UPGRADE, STAT_NAMES.index(stat_name))
+
+    def stop_recording(self):
+        if self.recorder:
+            self.recorder.close(self.sim.tick)
+            print(f"💾 Записано событий: {self.recorder.events}, тиков: {self.sim.tick}")
+            self.recorder = None
+
+    def on_close(self):
+        self.stop_recording()
+        super().on_close()
+
+    def on_key_press(self, key, modifiers):
+        self.send_input(KEY_DOWN, key)
+        if key == arcade.key.TAB or key == arcade.key.I:
+            if not self.inventory_key_pressed:
+                self.inventory.toggle()
+                self.inventory_key_pressed = True
+
+        if key == arcade.key.F3:
+            enabled = self.profiler.toggle()
+            if self.profiler_text is None:
+                self.profiler_text = arcade.Text(
+                    "", 10, SCREEN_HEIGHT - 190, arcade.color.LIME, 10,
+                    multiline=True, width=420, anchor_y="top"
+                )
+            self.sim.timer = self.profiler if enabled else None
+            self.profiler_refresh = 0
+            print(f"📊 Профайлер: {'включен' if enabled else 'выключен'}")
+        elif key == arcade.key.F4 and self.profiler.enabled:
+            path = self.profiler.dump_histogram(time.strftime("frame_histogram_%Y%m%d_%H%M%S.json"))
+            print(f"💾 Гистограмма кадров сохранена: {path}")
+
+    def on_key_release(self, key, modifiers):
+        self.send_input(KEY_UP, key)
+        if key == arcade.key.TAB or key == arcade.key.I:
+            self.inventory_key_pressed = False
+
+    def on_mouse_press(self, x, y, button, modifiers):
+        if button == arcade.MOUSE_BUTTON_LEFT:
+            # Клик по кнопке инвентаря - улучшение, а не выстрел
+            if self.inventory and self.inventory.check_click(x, y):
+                return
+            self.send_input(SHOOT)
+
+    def update_startup_report(self):
+        """Печатает отчет о старте, когда фоновая загрузка текстур закончилась"""
+        preloader = self.sim.preloader
+        if not self.first_frame_drawn or (preloader and not preloader.complete):
+            return
+        startup.timer.mark('textures')
+        self.startup_reported = True
+        print("⏱️ Старт игры по фазам:")
+        for line in startup.timer.lines():
+            print(f"   {line}")
+        if self.startup_report:
+            print(f"💾 Отчет о старте сохранен: {startup.timer.dump(self.startup_report)}")
+
+    def update_camera(self):
+        self.game_camera.center(self.sim.player.center_x, self.sim.player.center_y)
+
+    def on_update(self, delta_time):
+        prof = self.sim.timer
+        if prof:
+            prof.add_frame_time(delta_time)
+
+        steps = self.fixed_step.advance(delta_time)
+        for tick in range(steps):
+            if tick == steps - 1:
+                # Рисуем между позициями до и после последнего тика
+                self.interpolator.snapshot()
+            if self.replayer:
+                self.replayer.step(self.fixed_step.dt)
+                if self.replayer.finished:
+                    print("⏹️ Запись закончилась, управление у игрока")
+                    self.replayer = None
+            else:
+                self.sim.step(self.fixed_step.dt)
+        gamelog.tick()
+        if not self.startup_reported:
+            self.update_startup_report()
+
+        if prof:
+            self.profiler_refresh -= delta_time
+            if self.profiler_refresh <= 0:
+                self.profiler_refresh = PROFILER_REFRESH
+                self.update_profiler_overlay()
 
     def on_draw(self):
+        sim = self.sim
+        prof = sim.timer
+        if prof:
+            prof.begin()
+
         self.clear()
+        self.draw_calls = 0
+        self.interpolator.apply(self.fixed_step.alpha)
+        self.update_camera()
         self.game_camera.use()
+        sim.view = self.game_camera.viewport()
 
-        if self.level and hasattr(self.level, 'background'):
-            self.level.background.draw()
+        if sim.level and hasattr(sim.level, 'background'):
+            self.draw_calls += sim.level.background.draw()
+        if prof:
+            prof.lap('draw_background')
 
         with self.light_layer:
-            if self.level and hasattr(self.level, 'walls'):
-                self.level.walls.draw()
-            self.enemies.draw()
-            self.player_list.draw()
-            self.bullet_sprites.draw()
-            self.enemy_bullet_sprites.draw()  # 🔥 Рисуем вражеские пули
-
+            if sim.level and hasattr(sim.level, 'walls'):
+                self.draw_calls += sim.level.walls.draw()
+            self.draw_sprites(sim.enemies)
+            self.draw_sprites(sim.player_list)
+            self.draw_sprites(sim.bullet_sprites)
+            self.draw_sprites(sim.enemy_bullet_sprites)  # 🔥 Рисуем вражеские пули
+        self.interpolator.restore()
+        if prof:
+            prof.lap('draw_sprites')
+
+        sim.lights.update(*self.game_camera.viewport(), sim.player.center_x, sim.player.center_y)
         self.light_layer.draw(ambient_color=(20, 20, 20))
+        self.draw_calls += 2  # Проход света + наложение на кадр
+        if prof:
+            prof.lap('draw_lights')
 
-        for emitter in self.emitters:
-            emitter.draw()
+        self.draw_calls += self.particle_renderer.draw()  # Все частицы - один draw call
+        if prof:
+            prof.lap('draw_emitters')
 
         self.gui_camera.use()
         self.draw_hud()
 
-        if self.countdown_active:
+        if sim.countdown_active:
             self.draw_countdown()
+        if prof:
+            prof.lap('draw_hud')
 
         if self.inventory:
-            self.inventory.draw()
+            self.draw_calls += self.inventory.draw()
+
+        if prof:
+            prof.lap('draw_inventory')
+            self.draw_profiler_overlay()
+
+        if not self.first_frame_drawn:
+            self.first_frame_drawn = True
+            startup.timer.mark('first_frame')
+
+    def update_profiler_overlay(self):
+        """Пересчитывает счётчики и текст оверлея (несколько раз в секунду)"""
+        sim = self.sim
+        prof = self.profiler
+        prof.count('врагов', len(sim.enemies))
+        prof.count('пуль', sim.player_projectiles.count + sim.enemy_projectiles.count)
+        prof.count('сущностей', len(sim.entities))
+        prof.count('света', f"{len(sim.lights.active)}/{len(sim.lights)}")
+        prof.count('эмиттеров', len(sim.emitters))
+        prof.count('частиц', sim.particles.count)
+        if sim.level:
+            prof.count('чанков', len(sim.level.streamer.loaded))
+        prof.count('draw calls', self.draw_calls)
+        self.profiler_text.text = "\n".join(prof.summary_lines())
+
+    def draw_sprites(self, sprite_list):
+        """Рисует список спрайтов (пустой arcade не рисует - и не считаем)"""
+        if sprite_list:
+            sprite_list.draw()
+            self.draw_calls += 1
+
+    def draw_profiler_overlay(self):
+        arcade.draw_lrbt_rectangle_filled(
+            left=5,
+            right=435,
+            bottom=self.profiler_text.bottom - 5,
+            top=SCREEN_HEIGHT - 185,
+            color=(0, 0, 0, 180)
+        )
+        self.profiler_text.draw()
+        self.draw_calls += 2
 
     def draw_countdown(self):
+        sim = self.sim
         arcade.draw_lrbt_rectangle_filled(
             left=0,  # Начинаем от самого левого края экрана
             right=SCREEN_WIDTH,  # До самого правого края
@@ -1437,62 +2005,82 @@ class MyGame(arcade.Window):
             top=SCREEN_HEIGHT,  # До самого верхнего края
             color=(0, 0, 0, 150)
         )
+        self.draw_calls += 1
 
-        if self.countdown_time > 3:
+        if sim.countdown_time > 3:
             color = arcade.color.WHITE
             font_size = 120
-        elif self.countdown_time > 0:
+        elif sim.countdown_time > 0:
             color = arcade.color.YELLOW
             font_size = 140
         else:
             color = arcade.color.GREEN
             font_size = 100
 
-        arcade.draw_text(
-            self.countdown_text,
-            SCREEN_WIDTH // 2,
-            SCREEN_HEIGHT // 2,
-            color,
-            font_size,
-            anchor_x="center",
-            anchor_y="center",
-            bold=True
+        labels = self.countdown_labels
+        labels.text(
+            'countdown', sim.countdown_text,
+            SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2,
+            color, font_size,
+            anchor_x="center", anchor_y="center", bold=True
         )
-
-        arcade.draw_text(
-            "Можно двигаться во время отсчета!",
-            SCREEN_WIDTH // 2,
-            SCREEN_HEIGHT // 2 - 100,
-            arcade.color.LIGHT_GRAY,
-            24,
-            anchor_x="center",
-            anchor_y="center"
+        labels.text(
+            'hint_move', "Можно двигаться во время отсчета!",
+            SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100,
+            arcade.color.LIGHT_GRAY, 24,
+            anchor_x="center", anchor_y="center"
         )
-
-        arcade.draw_text(
-            "Управление: WASD/Стрелки - движение, ЛКМ - стрельба",
-            SCREEN_WIDTH // 2,
-            SCREEN_HEIGHT // 2 - 150,
-            arcade.color.LIGHT_GRAY,
-            20,
-            anchor_x="center",
-            anchor_y="center"
+        labels.text(
+            'hint_controls', "Управление: WASD/Стрелки - движение, ЛКМ - стрельба",
+            SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 150,
+            arcade.color.LIGHT_GRAY, 20,
+            anchor_x="center", anchor_y="center"
         )
-
-        arcade.draw_text(
-            "Tab/I - инвентарь прокачки",
-            SCREEN_WIDTH // 2,
-            SCREEN_HEIGHT // 2 - 180,
-            arcade.color.LIGHT_GRAY,
-            20,
-            anchor_x="center",
-            anchor_y="center"
+        labels.text(
+            'hint_inventory', "Tab/I - инвентарь прокачки",
+            SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 180,
+            arcade.color.LIGHT_GRAY, 20,
+            anchor_x="center", anchor_y="center"
         )
 
+        # Прогресс фоновой загрузки текстур
+        progress = sim.preload_progress
+        if progress < 1.0:
+            bar_left = SCREEN_WIDTH // 2 - 150
+            bar_right = SCREEN_WIDTH // 2 + 150
+            arcade.draw_lrbt_rectangle_filled(
+                left=bar_left,
+                right=bar_right,
+                bottom=15,
+                top=25,
+                color=arcade.color.DARK_GRAY
+            )
+            self.draw_calls += 1
+            if progress > 0:
+                arcade.draw_lrbt_rectangle_filled(
+                    left=bar_left,
+                    right=bar_left + (bar_right - bar_left) * progress,
+                    bottom=15,
+                    top=25,
+                    color=arcade.color.CYAN
+                )
+                self.draw_calls += 1
+            labels.text(
+                'loading', f"Загрузка: {int(progress * 100)}%",
+                SCREEN_WIDTH // 2, 35,
+                arcade.color.CYAN, 12,
+                anchor_x="center"
+            )
+
+        labels.draw()
+        self.draw_calls += 1
+
     def draw_hud(self):
+        sim = self.sim
+        labels = self.hud_labels
         # Здоровье игрока
-        arcade.draw_text(
-            f"HP: {self.player.health}/{self.player.max_health}",
+        labels.text(
+            'hp', f"HP: {sim.player.health}/{sim.player.max_health}",
             20, SCREEN_HEIGHT - 35,
             arcade.color.WHITE, 20
         )
@@ -1510,8 +2098,9 @@ class MyGame(arcade.Window):
             top=bar_top,
             color=arcade.color.DARK_GRAY
         )
+        self.draw_calls += 1
 
-        health_percent = max(0, self.player.health / self.player.max_health)
+        health_percent = max(0, sim.player.health / sim.player.max_health)
         health_right = bar_left + (bar_right - bar_left) * health_percent
 
         if health_percent > 0.7:
@@ -1529,6 +2118,7 @@ class MyGame(arcade.Window):
                 top=bar_top,
                 color=health_color
             )
+            self.draw_calls += 1
 
         arcade.draw_lrbt_rectangle_outline(
             left=bar_left,
@@ -1538,58 +2128,59 @@ class MyGame(arcade.Window):
             color=arcade.color.GRAY,
             border_width=2
         )
+        self.draw_calls += 1
 
         # 🔥 ИНФОРМАЦИЯ О ТИПАХ ВРАГОВ (правый верх)
         y_offset = SCREEN_HEIGHT - 35
-        for enemy_type, info in self.enemy_info.items():
+        for enemy_type, info in sim.enemy_info.items():
             if info['count'] > 0:
                 icon = info['icon']
                 color = info['color']
-                arcade.draw_text(
-                    f"{icon} {enemy_type}: {info['count']}",
+                labels.text(
+                    enemy_type, f"{icon} {enemy_type}: {info['count']}",
                     SCREEN_WIDTH - 200, y_offset,
                     color, 14
                 )
                 y_offset -= 25
 
         # Волна
-        wave_info = f"Волна: {self.wave_number - 1}"
-        if not self.wave_cleared and self.current_wave_enemies > 0:
-            enemies_left = len(self.enemies)
-            wave_info += f" ({enemies_left}/{self.current_wave_enemies})"
+        wave_info = f"Волна: {sim.wave_number - 1}"
+        if not sim.wave_cleared and sim.current_wave_enemies > 0:
+            enemies_left = len(sim.enemies)
+            wave_info += f" ({enemies_left}/{sim.current_wave_enemies})"
 
-        arcade.draw_text(
-            wave_info,
+        labels.text(
+            'wave', wave_info,
             SCREEN_WIDTH // 2 - 50, SCREEN_HEIGHT - 35,
             arcade.color.CYAN, 16
         )
 
         # Таймер следующей волны
-        if self.wave_cleared and self.spawn_interval - self.spawn_timer > 0:
-            time_left = self.spawn_interval - self.spawn_timer
-            arcade.draw_text(
-                f"След. волна: {time_left:.1f}с",
+        if sim.wave_cleared and sim.spawn_interval - sim.spawn_timer > 0:
+            time_left = sim.spawn_interval - sim.spawn_timer
+            labels.text(
+                'next_wave', f"След. волна: {time_left:.1f}с",
                 SCREEN_WIDTH - 150, SCREEN_HEIGHT - 85,
                 arcade.color.YELLOW, 14
             )
-        elif not self.wave_cleared:
-            arcade.draw_text(
-                "Убейте всех врагов!",
+        elif not sim.wave_cleared:
+            labels.text(
+                'kill_all', "Убейте всех врагов!",
                 SCREEN_WIDTH - 160, SCREEN_HEIGHT - 105,
                 arcade.color.RED, 14
             )
 
         # Очки навыков
-        if self.player.skill_points > 0:
-            arcade.draw_text(
-                f"🎯 {self.player.skill_points} оч. навыков (Tab)",
+        if sim.player.skill_points > 0:
+            labels.text(
+                'skill_points', f"🎯 {sim.player.skill_points} оч. навыков (Tab)",
                 SCREEN_WIDTH - 200, SCREEN_HEIGHT - 160,
                 arcade.color.GOLD, 14,
                 bold=True
             )
 
         # Опыт
-        xp_percent = min(1.0, self.player.xp / self.player.xp_to_next_level)
+        xp_percent = min(1.0, sim.player.xp / sim.player.xp_to_next_level)
         xp_left = 20
         xp_right = xp_left + 200
         xp_top = SCREEN_HEIGHT - 140
@@ -1605,6 +2196,7 @@ class MyGame(arcade.Window):
             top=xp_top,
             color=arcade.color.DARK_GREEN
         )
+        self.draw_calls += 1
 
         if xp_percent > 0:
             current_xp_width = 200 * xp_percent
@@ -1615,17 +2207,27 @@ class MyGame(arcade.Window):
                 top=xp_top,
                 color=arcade.color.LIME
             )
+            self.draw_calls += 1
 
-        arcade.draw_text(
-            f"Ур. {self.player.level} | {self.player.xp}/{self.player.xp_to_next_level} XP",
+        labels.text(
+            'xp', f"Ур. {sim.player.level} | {sim.player.xp}/{sim.player.xp_to_next_level} XP",
             20, SCREEN_HEIGHT - 170,
             arcade.color.GREEN, 14
         )
 
+        labels.draw()
+        self.draw_calls += 1
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Игра с волнами врагов")
+    parser.add_argument("--record", metavar="PATH", help="записать ввод сессии для точного повтора")
+    parser.add_argument("--replay", metavar="PATH", help="повторить записанную сессию")
+    parser.add_argument("--startup-report", metavar="PATH", help="сохранить время фаз старта в JSON")
+    args = parser.parse_args()
+    startup.timer.mark('import')
+
     try:
-        import arcade
         print(f"Версия Arcade: {arcade.__version__}")
         print("🎮 Игра с 4 типами врагов и боссом!")
         print("Типы врагов:")
@@ -1635,16 +2237,12 @@ def main():
         print("⚡ Быстрый - очень быстрый, но слабый")
         print("👑 Босс - появляется каждую 5-ю волну, очень сильный")
 
-        # Создаем папку для текстур врагов, если её нет
-        if not os.path.exists("textures/enemies"):
-            os.makedirs("textures/enemies")
-            print("📁 Создана папка для текстур врагов: textures/enemies/")
-            print("📝 Форматы имен файлов, которые поддерживаются:")
-            print("   1. basic_up_0.png, basic_up_1.png (рекомендуемый)")
-            print("   2. bas_up_0.png, bas_up_1.png (сокращенный)")
-            print("   3. enemy_basic_up_0.png (с приставкой enemy_)")
+        # Папку textures/enemies при необходимости создает AssetManifest.scan
+        gamelog.setup()
+        startup.timer.mark('console')
 
-        game = MyGame(SCREEN_WIDTH, SCREEN_HEIGHT, WINDOW_TITLE)
+        game = MyGame(SCREEN_WIDTH, SCREEN_HEIGHT, WINDOW_TITLE, record_path=args.record,
+                      replay_path=args.replay, startup_report=args.startup_report)
         game.setup()
         arcade.run()
     except Exception as e:
@@ -1652,6 +2250,8 @@ def main():
         import traceback
         traceback.print_exc()
         input("Нажмите Enter для выхода...")
+    finally:
+        gamelog.shutdown()
 
 
 if __name__ == "__main__":
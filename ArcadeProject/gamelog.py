@@ -0,0 +1,144 @@
+"""Журнал игры: уровни, категории, ограничение частоты и запись в фоне
+
+Игровой код пишет в логгеры категорий (combat, spawn, assets, progression)
+через get_logger(). Запись в консоль делает отдельный поток, поэтому
+медленный или перенаправленный stdout не тормозит кадр. Пока setup() не
+вызван, сообщения уровня INFO никуда не выводятся (бенчмарк, тесты).
+
+Переменные окружения для запуска игры:
+    GAME_LOG_LEVEL=DEBUG|INFO|WARNING   - минимальный уровень (INFO)
+    GAME_LOG_SUMMARY=1                  - бой сводкой раз в секунду
+"""
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+ROOT = "game"
+CATEGORIES = ('combat', 'spawn', 'assets', 'progression')
+
+_listener = None
+_summary = None
+
+
+def get_logger(category):
+    return logging.getLogger(f"{ROOT}.{category}")
+
+
+class RateLimitFilter(logging.Filter):
+    """Не больше limit одинаковых сообщений за period секунд
+
+    Одинаковые - с одним шаблоном (record.msg), поэтому аргументы нужно
+    передавать отдельно: log.info("%s нанес урон %d", name, damage).
+    О пропущенных сообщениях сообщается в первом сообщении нового окна.
+    """
+
+    def __init__(self, limit=5, period=1.0):
+        super().__init__()
+        self.limit = limit
+        self.period = period
+        self.windows = {}  # (логгер, шаблон) -> [начало окна, сколько было, сколько скрыто]
+
+    def filter(self, record):
+        key = (record.name, record.msg)
+        now = record.created
+        window = self.windows.get(key)
+        if window is None or now - window[0] >= self.period:
+            suppressed = window[2] if window else 0
+            self.windows[key] = [now, 1, 0]
+            if suppressed:
+                record.msg = f"{record.msg} (+{suppressed} похожих скрыто)"
+            return True
+
+        window[1] += 1
+        if window[1] > self.limit:
+            window[2] += 1
+            return False
+        return True
+
+
+class CombatSummary(logging.Filter):
+    """Режим сводки: боевые события не выводятся по одному, а считаются
+
+    Раз в interval секунд tick() выводит одну строку с количеством событий
+    каждого вида. Вид задаётся через extra={'event': ...}, иначе - сам текст.
+    """
+
+    def __init__(self, interval=1.0):
+        super().__init__()
+        self.interval = interval
+        self.counts = {}
+        self.started = time.monotonic()
+
+    def filter(self, record):
+        if record.name == f"{ROOT}.combat" and record.levelno < logging.WARNING \
+                and not getattr(record, 'summary', False):
+            event = getattr(record, 'event', None) or record.getMessage()
+            self.counts[event] = self.counts.get(event, 0) + 1
+            return False
+        return True
+
+    def tick(self):
+        now = time.monotonic()
+        if now - self.started < self.interval:
+            return
+        if self.counts:
+            parts = ", ".join(f"{event}: {count}" for event, count in self.counts.items())
+            get_logger('combat').info("⚔️ За %.1f с: %s", now - self.started, parts, extra={'summary': True})
+            self.counts = {}
+        self.started = now
+
+
+def setup(level=None, combat_summary=None, stream=None, rate_limit=(5, 1.0)):
+    """Включает вывод журнала через фоновый поток (вызывается один раз при запуске игры)"""
+    global _listener, _summary
+    if _listener is not None:
+        return
+
+    if level is None:
+        level = os.environ.get("GAME_LOG_LEVEL", "INFO").upper()
+    if combat_summary is None:
+        combat_summary = os.environ.get("GAME_LOG_SUMMARY") == "1"
+
+    # Очередь без ограничения: put() никогда не блокирует игровой цикл
+    records = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(records)
+    if combat_summary:
+        # Сводка раньше ограничителя частоты - считаются все события
+        _summary = CombatSummary()
+        queue_handler.addFilter(_summary)
+    if rate_limit:
+        queue_handler.addFilter(RateLimitFilter(*rate_limit))
+
+    writer = logging.StreamHandler(stream or sys.stdout)
+    writer.setFormatter(logging.Formatter("%(message)s"))
+
+    logger = logging.getLogger(ROOT)
+    logger.setLevel(level)
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(records, writer)
+    _listener.start()
+
+
+def tick():
+    """Раз в кадр: выводит сводку боя, если включен режим сводки"""
+    if _summary is not None:
+        _summary.tick()
+
+
+def shutdown():
+    """Дописывает всё из очереди и останавливает поток записи"""
+    global _listener, _summary
+    if _listener is None:
+        return
+    _listener.stop()
+    logger = logging.getLogger(ROOT)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.propagate = True
+    _listener = None
+    _summary = None
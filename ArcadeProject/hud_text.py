@@ -0,0 +1,54 @@
+import arcade
+import pyglet
+
+
+class TextCache:
+    """Надписи интерфейса как arcade.Text в одном пакете (pyglet Batch)
+
+    Каждый кадр код рисования вызывает text(key, ...) для нужных надписей.
+    Надпись создаётся один раз, а глифы перестраиваются только когда
+    действительно поменялись строка, цвет, размер или позиция. draw()
+    прячет надписи, которые в этом кадре не запрашивались, и рисует все
+    остальные одним вызовом.
+    """
+
+    def __init__(self):
+        self.batch = pyglet.graphics.Batch()
+        self.labels = {}  # ключ -> arcade.Text
+        self.state = {}  # ключ -> (строка, x, y, цвет, размер)
+        self.requested = set()
+        self.layouts = 0  # сколько раз надписи перестраивались (для профайлера)
+
+    def text(self, key, value, x, y, color=arcade.color.WHITE, font_size=12, **style):
+        """Показать надпись key в этом кадре. style (bold, anchor_x...) задаётся при создании"""
+        self.requested.add(key)
+        state = (value, x, y, color, font_size)
+        old = self.state.get(key)
+        if old == state:
+            return
+
+        label = self.labels.get(key)
+        if label is None:
+            self.labels[key] = arcade.Text(value, x, y, color, font_size, batch=self.batch, **style)
+            self.state[key] = state
+            self.layouts += 1
+            return
+
+        if old[0] != value:
+            label.text = value
+        if old[1] != x or old[2] != y:
+            label.position = (x, y)
+        if old[3] != color:
+            label.color = color
+        if old[4] != font_size:
+            label.font_size = font_size
+        self.state[key] = state
+        self.layouts += 1
+
+    def draw(self):
+        for key, label in self.labels.items():
+            visible = key in self.requested
+            if label.visible != visible:
+                label.visible = visible
+        self.requested.clear()
+        self.batch.draw()
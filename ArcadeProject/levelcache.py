@@ -0,0 +1,220 @@
+"""Скомпилированные уровни: TMX + тайлсеты -> один двоичный файл
+
+Разбор XML, распаковка zlib/base64 и построение сетки стен и поля
+расстояний делаются один раз. Результат лежит рядом с картой в
+.level_cache/<карта>-<хэш TMX>.lvl:
+
+    b"ARLV", версия (uint16), длина заголовка (uint32)
+    заголовок - JSON: свойства карты, размеры, тайлсеты, хэши исходников,
+                      описание массивов (dtype, shape, смещение)
+    массивы - подряд, каждый с границы 64 байт
+
+При загрузке проверяются хэши TMX и всех внешних тайлсетов. Если что-то
+изменилось, уровень компилируется заново. Массивы не читаются целиком, а
+отображаются в память (np.memmap, только чтение).
+"""
+import hashlib
+import json
+import os
+import struct
+import xml.etree.ElementTree as ElementTree
+from pathlib import Path
+
+import numpy as np
+import pytiled_parser
+
+import chunks
+import distance_field
+
+MAGIC = b"ARLV"
+VERSION = 2
+PREFIX = struct.Struct("<4sHI")  # magic, версия, длина заголовка
+ALIGN = 64
+CACHE_DIR = ".level_cache"
+TILE_LAYERS = ("fon", "walls", "collision")
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class CompiledLevel:
+    """Данные уровня из кэша: всё, что нужно Level, без XML"""
+
+    def __init__(self, header, arrays):
+        self.properties = header["properties"]
+        self.tile_width = header["tile_width"]
+        self.tile_height = header["tile_height"]
+        self.grid_width = header["grid_width"]
+        self.grid_height = header["grid_height"]
+        # JSON хранит ключи строками, а firstgid нужен числом
+        self.tilesets = {int(firstgid): tileset for firstgid, tileset in header["tilesets"].items()}
+        self.layers = {name: arrays[name] for name in TILE_LAYERS if name in arrays}
+        self.solid = arrays["solid"]
+        self.sdf = arrays["sdf"]
+        self.sdf_grad_x = arrays["sdf_grad_x"]
+        self.sdf_grad_y = arrays["sdf_grad_y"]
+
+
+def cache_path(map_name, source_hash):
+    directory = os.path.join(os.path.dirname(os.path.abspath(map_name)), CACHE_DIR)
+    stem = os.path.splitext(os.path.basename(map_name))[0]
+    return os.path.join(directory, f"{stem}-{source_hash[:16]}.lvl")
+
+
+def load(map_name):
+    """Уровень из кэша; если кэша нет или исходники изменились - компилирует"""
+    source_hash = file_hash(map_name)
+    path = cache_path(map_name, source_hash)
+    compiled = read(path, map_name, source_hash)
+    if compiled is None:
+        write(path, *compile_level(map_name, source_hash))
+        compiled = read(path, map_name, source_hash)
+    return compiled
+
+
+def read(path, map_name, source_hash):
+    """Открывает кэш. None - если его нет, он другой версии или устарел"""
+    try:
+        with open(path, "rb") as f:
+            magic, version, header_size = PREFIX.unpack(f.read(PREFIX.size))
+            if magic != MAGIC or version != VERSION:
+                return None
+            header = json.loads(f.read(header_size).decode("utf-8"))
+    except (OSError, struct.error, ValueError):
+        return None
+
+    if header["source"] != source_hash:
+        return None
+    map_directory = os.path.dirname(os.path.abspath(map_name))
+    for dependency, dependency_hash in header["dependencies"]:
+        try:
+            if file_hash(os.path.join(map_directory, dependency)) != dependency_hash:
+                return None
+        except OSError:
+            return None
+
+    arrays = {}
+    for name, info in header["arrays"].items():
+        shape = tuple(info["shape"])
+        if 0 in shape:
+            # Пустой массив отобразить в память нельзя
+            arrays[name] = np.zeros(shape, dtype=info["dtype"])
+        else:
+            arrays[name] = np.memmap(path, dtype=info["dtype"], mode="r", offset=info["offset"], shape=shape)
+    return CompiledLevel(header, arrays)
+
+
+def write(path, header, arrays):
+    """Записывает кэш атомарно (через временный файл) и убирает старые версии этой карты"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    # Смещения массивов зависят от длины заголовка, а она - от смещений:
+    # считаем их относительно конца заголовка, дополненного до ALIGN
+    layout = {}
+    position = 0
+    for name, array in arrays.items():
+        position = -(-position // ALIGN) * ALIGN
+        layout[name] = position
+        position += array.nbytes
+    header = dict(header, arrays={})
+    while True:
+        header_bytes = json.dumps(header, ensure_ascii=False, default=str).encode("utf-8")
+        data_start = -(-(PREFIX.size + len(header_bytes)) // ALIGN) * ALIGN
+        arrays_info = {
+            name: {"dtype": array.dtype.str, "shape": list(array.shape), "offset": data_start + layout[name]}
+            for name, array in arrays.items()
+        }
+        if header["arrays"] == arrays_info:
+            break
+        header["arrays"] = arrays_info
+
+    temporary = f"{path}.tmp{os.getpid()}"
+    with open(temporary, "wb") as f:
+        f.write(PREFIX.pack(MAGIC, VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.write(b"\0" * (arrays_info[name]["offset"] - f.tell()))
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(temporary, path)
+
+    stem = os.path.basename(path).rsplit("-", 1)[0]
+    for old in os.listdir(directory):
+        if old.startswith(stem + "-") and old.endswith(".lvl") and old != os.path.basename(path):
+            try:
+                os.remove(os.path.join(directory, old))
+            except OSError:
+                pass  # Старый кэш еще открыт (Windows) - удалится в следующий раз
+
+
+def compile_level(map_name, source_hash):
+    """Разбирает TMX и тайлсеты: (заголовок, массивы) для write()"""
+    tiled_map = pytiled_parser.parse_map(Path(map_name))
+    if tiled_map.infinite:
+        raise ValueError("бесконечные карты не поддерживаются")
+    map_directory = os.path.dirname(os.path.abspath(map_name))
+
+    tile_width = tiled_map.tile_size.width or 1
+    tile_height = tiled_map.tile_size.height or 1
+    grid_width = tiled_map.map_size.width
+    grid_height = tiled_map.map_size.height
+
+    arrays = {}
+    for layer in tiled_map.layers:
+        if isinstance(layer, pytiled_parser.TileLayer) and layer.name in TILE_LAYERS:
+            grid = chunks.layer_grid(layer, grid_height)
+            if grid is not None:
+                arrays[layer.name] = grid
+
+    collision = arrays.get("collision")
+    if collision is None:
+        solid = np.zeros((grid_height, grid_width), dtype=bool)
+    else:
+        solid = collision != 0
+    sdf, grad_x, grad_y = distance_field.signed_distance_field(solid, tile_width, tile_height)
+    arrays.update(solid=solid, sdf=sdf, sdf_grad_x=grad_x, sdf_grad_y=grad_y)
+
+    header = {
+        "source": source_hash,
+        "dependencies": [
+            [dependency, file_hash(os.path.join(map_directory, dependency))]
+            for dependency in tileset_sources(map_name)
+        ],
+        "properties": dict(tiled_map.properties or {}),
+        "tile_width": tile_width,
+        "tile_height": tile_height,
+        "grid_width": grid_width,
+        "grid_height": grid_height,
+        "tilesets": {
+            firstgid: tileset_info(tileset, map_directory)
+            for firstgid, tileset in tiled_map.tilesets.items()
+        },
+    }
+    return header, arrays
+
+
+def tileset_sources(map_name):
+    """Внешние тайлсеты (.tsx), на которые ссылается TMX"""
+    root = ElementTree.parse(map_name).getroot()
+    return [tileset.get("source") for tileset in root.iter("tileset") if tileset.get("source")]
+
+
+def tileset_info(tileset, map_directory):
+    """Всё, что нужно TileTextures, в виде JSON (пути - относительно папки карты)"""
+    def relative(path):
+        return os.path.relpath(os.path.abspath(path), map_directory)
+
+    return {
+        "image": relative(tileset.image) if tileset.image is not None else None,
+        "columns": tileset.columns,
+        "margin": tileset.margin,
+        "spacing": tileset.spacing,
+        "tile_width": tileset.tile_width,
+        "tile_height": tileset.tile_height,
+        "tiles": {
+            str(tile_id): relative(tile.image)
+            for tile_id, tile in (tileset.tiles or {}).items() if tile.image is not None
+        },
+    }
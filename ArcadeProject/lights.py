@@ -0,0 +1,128 @@
+import numpy as np
+from arcade.future.light import Light
+
+# Вес дистанции по типу света: чем больше, тем раньше свет отбрасывается.
+# Свет игрока (вес 0) всегда в приоритете
+LIGHT_WEIGHTS = {
+    'player': 0.0,
+    'enemies': 1.0,
+    'bullets': 2.0,
+    'enemy_bullets': 2.0,
+}
+MERGE_KINDS = ('bullets', 'enemy_bullets')
+
+
+class LightManager:
+    """Прослойка перед LightLayer: отсечение по камере, бюджет и слияние света пуль
+
+    Все источники регистрируются здесь (add/remove), а в LightLayer каждый
+    кадр попадают только видимые в окне камеры, не больше max_lights штук,
+    отсортированные по дистанции до игрока с учетом типа. Близкие огни пуль
+    одного цвета заменяются одним общим огнем.
+    """
+
+    def __init__(self, light_layer=None, max_lights=48, merge_radius=32):
+        self.light_layer = light_layer
+        self.max_lights = max_lights
+        self.merge_radius = merge_radius
+        self.kinds = {}  # свет -> тип
+        self.styles = {}  # свет -> (цвет, режим): по ним сливаются огни пуль
+        self.active = set()  # что сейчас стоит в light_layer
+        self.merged = 0  # сколько огней пуль слито за прошлый кадр
+        self._proxies = {}  # (цвет, режим) -> общие огни для слитых пуль
+
+    def add(self, light, kind='other', style=None):
+        """Регистрирует свет. style - (цвет, 'soft'/'hard'), без него огонь не сливается"""
+        self.kinds[light] = kind
+        if style is not None:
+            color, mode = style
+            self.styles[light] = (tuple(color[:3]), mode)
+
+    def add_many(self, lights, kind='other'):
+        self.kinds.update(dict.fromkeys(lights, kind))
+
+    def remove(self, light):
+        self.kinds.pop(light, None)
+        self.styles.pop(light, None)
+        if light in self.active:
+            self.active.discard(light)
+            if self.light_layer is not None:
+                self.light_layer.remove(light)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __contains__(self, light):
+        return light in self.kinds
+
+    def update(self, left, right, bottom, top, focus_x, focus_y):
+        """Выбирает огни для этого кадра и синхронизирует light_layer"""
+        wanted = self.select(left, right, bottom, top, focus_x, focus_y)
+
+        if self.light_layer is not None:
+            for light in self.active - wanted:
+                self.light_layer.remove(light)
+            for light in wanted - self.active:
+                self.light_layer.add(light)
+        self.active = wanted
+
+    def select(self, left, right, bottom, top, focus_x, focus_y):
+        lights = list(self.kinds)
+        n = len(lights)
+        if n == 0:
+            return set()
+
+        xs = np.fromiter((light.position[0] for light in lights), dtype=float, count=n)
+        ys = np.fromiter((light.position[1] for light in lights), dtype=float, count=n)
+        radii = np.fromiter((light.radius for light in lights), dtype=float, count=n)
+
+        # 1. Отсечение: круг света пересекает окно камеры
+        visible = (xs + radii >= left) & (xs - radii <= right) & (ys + radii >= bottom) & (ys - radii <= top)
+        indices = np.flatnonzero(visible).tolist()
+
+        # 2. Слияние близких огней пуль одного цвета
+        candidates = []
+        groups = {}
+        for i in indices:
+            light = lights[i]
+            kind = self.kinds[light]
+            style = self.styles.get(light)
+            if kind in MERGE_KINDS and style is not None:
+                key = (style, int(xs[i] // self.merge_radius), int(ys[i] // self.merge_radius))
+                groups.setdefault(key, []).append(i)
+            else:
+                candidates.append((light, kind, xs[i], ys[i]))
+
+        self.merged = 0
+        used = {}  # сколько общих огней каждого вида уже занято в этом кадре
+        for (style, _, _), members in groups.items():
+            light = lights[members[0]]
+            kind = self.kinds[light]
+            if len(members) == 1:
+                candidates.append((light, kind, xs[members[0]], ys[members[0]]))
+                continue
+
+            cx = float(xs[members].mean())
+            cy = float(ys[members].mean())
+            proxy = self._proxy(style, used.get(style, 0))
+            used[style] = used.get(style, 0) + 1
+            proxy.position = (cx, cy)
+            proxy.radius = float(radii[members].max()) + self.merge_radius / 2
+            self.merged += len(members)
+            candidates.append((proxy, kind, cx, cy))
+
+        # 3. Бюджет: ближайшие к игроку с учетом веса типа
+        if len(candidates) > self.max_lights:
+            candidates.sort(key=lambda item: LIGHT_WEIGHTS.get(item[1], 1.0) *
+                            ((item[2] - focus_x) ** 2 + (item[3] - focus_y) ** 2))
+            candidates = candidates[:self.max_lights]
+
+        return {item[0] for item in candidates}
+
+    def _proxy(self, style, index):
+        """Общий огонь номер index для цвета и режима style"""
+        pool = self._proxies.setdefault(style, [])
+        if index == len(pool):
+            color, mode = style
+            pool.append(Light(0, 0, 1, color, mode))
+        return pool[index]
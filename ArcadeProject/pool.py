@@ -0,0 +1,61 @@
+class ObjectPool:
+    """Пул переиспользуемых объектов с ограниченным размером
+
+    Объекты создаются заранее (prewarm) и возвращаются в пул вместо удаления.
+    Если пул пуст, создаётся новый объект (промах), если пул переполнен -
+    лишний объект просто отбрасывается.
+    """
+
+    def __init__(self, factory, max_size=256, prewarm=0):
+        self.factory = factory
+        self.max_size = max_size
+        self.free = []
+
+        # Счётчики для отладки
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+        self.in_use = 0
+        self.high_water = 0
+
+        self.prewarm(prewarm)
+
+    def prewarm(self, count):
+        """Досоздает объекты, пока свободных не станет count (не больше max_size)"""
+        created = 0
+        while len(self.free) < min(count, self.max_size):
+            self.free.append(self.factory())
+            created += 1
+        return created
+
+    def acquire(self):
+        """Берёт объект из пула (или создаёт новый)"""
+        if self.free:
+            obj = self.free.pop()
+            self.hits += 1
+        else:
+            obj = self.factory()
+            self.misses += 1
+
+        self.in_use += 1
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+        return obj
+
+    def release(self, obj):
+        """Возвращает объект в пул"""
+        self.in_use -= 1
+        if len(self.free) < self.max_size:
+            self.free.append(obj)
+        else:
+            self.discarded += 1
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'discarded': self.discarded,
+            'in_use': self.in_use,
+            'high_water': self.high_water,
+            'free': len(self.free),
+        }
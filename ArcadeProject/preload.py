@@ -0,0 +1,87 @@
+import queue
+import threading
+
+from PIL import Image
+import arcade
+from arcade.texture import ImageData
+
+
+class AssetPreloader:
+    """Фоновая загрузка картинок во время отсчета
+
+    Рабочий поток только читает и декодирует файлы (PIL). Текстуры arcade
+    создаются и загружаются в атлас (GL) в главном потоке небольшими
+    порциями через update(), чтобы не было рывков кадра.
+    """
+
+    def __init__(self, manifest, paths, per_frame=4, atlas=None):
+        self.manifest = manifest
+        self.paths = [path for path in paths if path not in manifest.textures]
+        self.per_frame = per_frame
+        self.atlas = atlas
+        self.total = len(self.paths)
+        self.done = 0
+        self.failed = []
+        self._decoded = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None and self.total:
+            self._thread = threading.Thread(target=self._worker, name="asset-preload", daemon=True)
+            self._thread.start()
+        return self
+
+    def _worker(self):
+        for path in self.paths:
+            try:
+                image = Image.open(path)
+                if image.mode != "RGBA":
+                    image = image.convert("RGBA")
+                image.load()
+            except Exception as e:
+                image = e
+            self._decoded.put((path, image))
+
+    @property
+    def progress(self):
+        """Доля загруженных картинок от 0 до 1"""
+        return self.done / self.total if self.total else 1.0
+
+    @property
+    def complete(self):
+        return self.done >= self.total
+
+    def update(self, max_items=None):
+        """Доводит до текстур не больше max_items картинок (вызывается раз в кадр)"""
+        budget = self.per_frame if max_items is None else max_items
+        while budget > 0 and not self.complete:
+            try:
+                path, image = self._decoded.get_nowait()
+            except queue.Empty:
+                return
+            self._finish_one(path, image)
+            budget -= 1
+
+    def finish(self):
+        """Дожидается всех картинок (если отсчет закончился раньше загрузки)"""
+        self.start()
+        while not self.complete:
+            path, image = self._decoded.get()
+            self._finish_one(path, image)
+
+    def _finish_one(self, path, image):
+        self.done += 1
+        if isinstance(image, Exception):
+            self.failed.append((path, image))
+            return
+        if path in self.manifest.textures:
+            return
+
+        # Хэш - путь к файлу, как в AssetManifest.load: у одного файла одна
+        # запись в атласе, как бы он ни был загружен
+        texture = arcade.Texture(ImageData(image, hash=path))
+        texture.file_path = arcade.resources.resolve(path)
+        self.manifest.textures[path] = texture
+
+        if self.atlas is not None:
+            self.atlas.add(texture)
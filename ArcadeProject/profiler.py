@@ -0,0 +1,111 @@
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+
+class PhaseTimer:
+    """Замеряет время фаз кадра "кругами": lap(name) = время с прошлой отметки
+
+    Симуляция вызывает lap() только если таймер подключён, поэтому без
+    таймера накладных расходов почти нет. window - сколько последних
+    замеров хранить на фазу (None - все).
+    """
+
+    def __init__(self, window=None):
+        self.window = window
+        self.samples = {}  # фаза -> длительности в секундах
+        self.frames = 0
+        self._last = 0.0
+
+    def begin(self):
+        self._last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        bucket = self.samples.get(phase)
+        if bucket is None:
+            bucket = self.samples[phase] = deque(maxlen=self.window) if self.window else []
+        bucket.append(now - self._last)
+        self._last = now
+
+    def end_frame(self):
+        self.frames += 1
+
+    def reset(self):
+        self.samples = {}
+        self.frames = 0
+
+
+class FrameProfiler(PhaseTimer):
+    """Профайлер игры: фазы update/draw, счётчики и время кадра за последние N кадров"""
+
+    def __init__(self, window=300):
+        super().__init__(window)
+        self.enabled = False
+        self.frame_times = deque(maxlen=window)
+        self.counters = {}
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.reset()
+        return self.enabled
+
+    def reset(self):
+        super().reset()
+        self.frame_times.clear()
+        self.counters = {}
+
+    def add_frame_time(self, delta_time):
+        self.frame_times.append(delta_time)
+
+    def count(self, name, value):
+        self.counters[name] = value
+
+    def phase_averages(self):
+        """Средняя длительность каждой фазы в миллисекундах"""
+        return {
+            phase: sum(samples) / len(samples) * 1000.0
+            for phase, samples in self.samples.items() if samples
+        }
+
+    def summary_lines(self):
+        """Строки для оверлея"""
+        lines = []
+        if self.frame_times:
+            ms = np.asarray(self.frame_times) * 1000.0
+            lines.append(f"кадр: {np.median(ms):.1f} мс (p95 {np.percentile(ms, 95):.1f}, "
+                         f"p99 {np.percentile(ms, 99):.1f}) ~{1000.0 / max(np.mean(ms), 1e-6):.0f} FPS")
+
+        for phase, avg in sorted(self.phase_averages().items(), key=lambda item: -item[1]):
+            lines.append(f"{phase:<20} {avg:7.3f} мс")
+
+        if self.counters:
+            lines.append(" | ".join(f"{name}: {value}" for name, value in self.counters.items()))
+        return lines
+
+    def histogram(self, bin_ms=1.0, max_ms=100.0):
+        """Гистограмма времени кадра: список (от_мс, до_мс, кадров)"""
+        ms = np.asarray(self.frame_times) * 1000.0
+        edges = np.arange(0.0, max_ms + bin_ms, bin_ms)
+        counts, _ = np.histogram(np.clip(ms, 0.0, max_ms), bins=edges)
+        return [(float(edges[i]), float(edges[i + 1]), int(counts[i])) for i in range(len(counts))]
+
+    def dump_histogram(self, path, bin_ms=1.0, max_ms=100.0):
+        """Сохраняет гистограмму кадров и средние по фазам в JSON"""
+        data = {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "frames": len(self.frame_times),
+            "bin_ms": bin_ms,
+            "histogram": [
+                {"from_ms": start, "to_ms": end, "frames": count}
+                for start, end, count in self.histogram(bin_ms, max_ms) if count
+            ],
+            "phases_ms": self.phase_averages(),
+            "counters": self.counters,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        return path
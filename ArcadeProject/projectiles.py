@@ -0,0 +1,148 @@
+import numpy as np
+
+
+class ProjectileSystem:
+    """Все снаряды одной стороны в непрерывных массивах NumPy (struct-of-arrays)
+
+    Позиции, скорости, время жизни, урон и радиус лежат в отдельных массивах,
+    живые снаряды всегда занимают первые ``count`` слотов. Визуальная часть
+    (спрайт, свет, след) хранится в ``handles`` по тем же индексам, а
+    ``shown`` - показана ли она сейчас (см. sync_handles).
+    """
+
+    def __init__(self, capacity=256):
+        self.count = 0
+        self.capacity = 0
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.vx = np.zeros(0)
+        self.vy = np.zeros(0)
+        self.lifetime = np.zeros(0)
+        self.damage = np.zeros(0)
+        self.radius = np.zeros(0)
+        self.handles = np.empty(0, dtype=object)
+        self.shown = np.zeros(0, dtype=bool)
+        self._grow(capacity)
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self, capacity):
+        """Увеличивает ёмкость массивов (амортизированно, удвоением)"""
+        capacity = max(capacity, 1)
+        for name in ('x', 'y', 'vx', 'vy', 'lifetime', 'damage', 'radius'):
+            old = getattr(self, name)
+            new = np.zeros(capacity)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+        handles = np.empty(capacity, dtype=object)
+        handles[:self.count] = self.handles[:self.count]
+        self.handles = handles
+
+        shown = np.zeros(capacity, dtype=bool)
+        shown[:self.count] = self.shown[:self.count]
+        self.shown = shown
+        self.capacity = capacity
+
+    def spawn(self, x, y, vx, vy, lifetime, damage, radius, handle=None):
+        """Добавляет снаряд и возвращает его слот"""
+        if self.count >= self.capacity:
+            self._grow(self.capacity * 2)
+
+        i = self.count
+        self.x[i] = x
+        self.y[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.lifetime[i] = lifetime
+        self.damage[i] = damage
+        self.radius[i] = radius
+        self.handles[i] = handle
+        self.shown[i] = True
+        self.count += 1
+        return i
+
+    def step(self, delta_time):
+        """Двигает все снаряды и возвращает маску истёкших"""
+        n = self.count
+        self.x[:n] += self.vx[:n] * delta_time
+        self.y[:n] += self.vy[:n] * delta_time
+        self.lifetime[:n] -= delta_time
+        return self.lifetime[:n] <= 0
+
+    def hits_circle(self, cx, cy, r):
+        """Маска снарядов, задевших круг (cx, cy, r)"""
+        n = self.count
+        dx = self.x[:n] - cx
+        dy = self.y[:n] - cy
+        reach = self.radius[:n] + r
+        return dx * dx + dy * dy < reach * reach
+
+    def first_hits(self, cxs, cys, rs):
+        """Для каждого снаряда - индекс первого задетого круга или -1"""
+        n = self.count
+        if n == 0 or len(cxs) == 0:
+            return np.full(n, -1, dtype=np.intp)
+
+        dx = self.x[:n, None] - cxs[None, :]
+        dy = self.y[:n, None] - cys[None, :]
+        reach = self.radius[:n, None] + rs[None, :]
+        hit = dx * dx + dy * dy < reach * reach
+
+        first = hit.argmax(axis=1)
+        first[~hit.any(axis=1)] = -1
+        return first
+
+    def compact(self, dead):
+        """Удаляет мёртвые снаряды, сдвигая живых в начало массивов
+
+        Возвращает список ``handles`` удалённых снарядов.
+        """
+        n = self.count
+        if n == 0 or not dead.any():
+            return []
+
+        removed = self.handles[:n][dead].tolist()
+        keep = ~dead
+        alive = int(keep.sum())
+
+        for arr in (self.x, self.y, self.vx, self.vy, self.lifetime, self.damage, self.radius):
+            arr[:alive] = arr[:n][keep]
+
+        self.handles[:alive] = self.handles[:n][keep]
+        self.shown[:alive] = self.shown[:n][keep]
+        self.handles[alive:n] = None
+        self.count = alive
+        return removed
+
+    def sync_handles(self, view=None, margin=0):
+        """Переносит позиции из массивов в спрайты/свет/след
+
+        view - видимая область (left, right, bottom, top). Снаряды дальше
+        margin за ее краем не трогаются, поэтому их визуальная часть
+        должна быть скрыта: иначе она замрет на месте и попадет в кадр,
+        когда туда сдвинется камера. Возвращает (entered, gone) - хэндлы,
+        которые вернулись в область и которые из нее вышли, чтобы вызывающий
+        показал и скрыл их. None - переносятся все (без окна).
+        """
+        n = self.count
+        if view is None:
+            inside = np.ones(n, dtype=bool)
+        else:
+            left, right, bottom, top = view
+            x = self.x[:n]
+            y = self.y[:n]
+            inside = (x >= left - margin) & (x <= right + margin) & (y >= bottom - margin) & (y <= top + margin)
+
+        changed = np.flatnonzero(inside != self.shown[:n])
+        entered = self.handles[changed[inside[changed]]].tolist()
+        gone = self.handles[changed[~inside[changed]]].tolist()
+        self.shown[:n] = inside
+
+        indices = np.flatnonzero(inside)
+        for handle, x, y in zip(self.handles[indices].tolist(),
+                                self.x[indices].tolist(), self.y[indices].tolist()):
+            if handle is not None:
+                handle.move_to(x, y)
+        return entered, gone
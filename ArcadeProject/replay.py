@@ -0,0 +1,152 @@
+"""Запись ввода игрока и точный повтор сессии
+
+Симуляция детерминирована: вся случайность идёт из одного зерна
+(Simulation.seed), а время - фиксированными тиками. Поэтому для повтора
+достаточно сохранить зерно, карту и ввод с номером тика, на котором он
+пришёл. Файл маленький: заголовок + 13 байт на событие.
+
+    python game.py --record session.bin     # играть и записывать
+    python game.py --replay session.bin     # посмотреть запись в окне
+    python replay.py session.bin --profile  # прогнать без окна и замерить фазы
+"""
+import argparse
+import struct
+import time
+
+MAGIC = b"ARPL"
+VERSION = 2
+HEADER = struct.Struct("<4sHQHH")  # magic, версия, зерно, тиков в секунду, длина имени карты
+# Тик, вид события, значение. Значение 64-битное: клавиши без кода в pyglet
+# приходят как key.user_key(scancode) = scancode << 32 и в int32 не влезают
+EVENT = struct.Struct("<IBq")
+EVENTS = {1: struct.Struct("<IBi"), VERSION: EVENT}  # версия -> формат события (v1 читается)
+
+# Виды событий
+KEY_DOWN = 1  # значение - код клавиши
+KEY_UP = 2
+SHOOT = 3  # значение не используется
+UPGRADE = 4  # значение - номер характеристики в STAT_NAMES
+END = 255  # последний тик записи
+
+
+class InputRecorder:
+    """Пишет события ввода в файл по мере игры"""
+
+    def __init__(self, path, seed, tick_rate, map_name):
+        self.path = path
+        self.file = open(path, "wb")
+        name = map_name.encode("utf-8")
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, tick_rate, len(name)))
+        self.file.write(name)
+        self.events = 0
+
+    def record(self, tick, kind, value=0):
+        self.file.write(EVENT.pack(tick, kind, value))
+        self.events += 1
+
+    def close(self, final_tick):
+        if self.file.closed:
+            return
+        self.record(final_tick, END)
+        self.file.close()
+
+
+class InputLog:
+    """Загруженная запись: зерно, карта и события, сгруппированные по тикам"""
+
+    def __init__(self, seed, tick_rate, map_name, events, final_tick):
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.map_name = map_name
+        self.events = events  # тик -> [(вид, значение), ...]
+        self.final_tick = final_tick
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+
+        magic, version, seed, tick_rate, name_length = HEADER.unpack_from(data)
+        if magic != MAGIC or version not in EVENTS:
+            raise ValueError(f"{path}: не файл записи или другая версия формата")
+        offset = HEADER.size
+        map_name = data[offset:offset + name_length].decode("utf-8")
+        offset += name_length
+
+        events = {}
+        final_tick = 0
+        for tick, kind, value in EVENTS[version].iter_unpack(data[offset:]):
+            final_tick = max(final_tick, tick)
+            if kind != END:
+                events.setdefault(tick, []).append((kind, value))
+        return cls(seed, tick_rate, map_name, events, final_tick)
+
+    @property
+    def duration(self):
+        return self.final_tick / self.tick_rate
+
+
+class Replayer:
+    """Подаёт записанный ввод в симуляцию перед нужными тиками"""
+
+    def __init__(self, log, sim):
+        self.log = log
+        self.sim = sim
+
+    @property
+    def finished(self):
+        return self.sim.tick >= self.log.final_tick
+
+    def step(self, delta_time):
+        """Один тик: сначала ввод этого тика, потом Simulation.step"""
+        sim = self.sim
+        for kind, value in self.log.events.get(sim.tick, ()):
+            sim.apply_input(kind, value)
+        sim.step(delta_time)
+
+
+def fast_forward(path, profile=False):
+    """Прогоняет запись без окна так быстро, как получится
+
+    С profile=True возвращает PhaseTimer с замерами каждой фазы каждого
+    тика - медленный участок сессии можно разобрать кадр за кадром.
+    """
+    import game
+    from profiler import PhaseTimer
+
+    log = InputLog.load(path)
+    sim = game.Simulation(seed=log.seed)
+    sim.setup(log.map_name)
+    timer = PhaseTimer() if profile else None
+    sim.timer = timer
+
+    replayer = Replayer(log, sim)
+    dt = 1.0 / log.tick_rate
+    while not replayer.finished:
+        replayer.step(dt)
+    return sim, timer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Повтор записанной сессии без окна")
+    parser.add_argument("path", help="файл записи (game.py --record)")
+    parser.add_argument("--profile", action="store_true", help="замерить фазы каждого тика")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sim, timer = fast_forward(args.path, args.profile)
+    elapsed = time.perf_counter() - start
+    print(f"⏩ {sim.tick} тиков за {elapsed:.2f} с, волна {sim.wave_number}, "
+          f"врагов {len(sim.enemies)}, здоровье {sim.player.health}")
+
+    if timer:
+        # Фазы замеряются только после отсчета, поэтому номер тика - с конца
+        print(f"{'фаза':<20}{'всего, мс':>12}{'макс, мс':>10}{'на тике':>10}")
+        for phase, samples in timer.samples.items():
+            worst = max(range(len(samples)), key=samples.__getitem__)
+            tick = sim.tick - len(samples) + worst + 1
+            print(f"{phase:<20}{sum(samples) * 1000:>12.1f}{samples[worst] * 1000:>10.3f}{tick:>10}")
+
+
+if __name__ == "__main__":
+    main()
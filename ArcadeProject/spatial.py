@@ -0,0 +1,126 @@
+import math
+
+import numpy as np
+
+# Соседние ячейки "вперёд": каждая пара ячеек проверяется только один раз
+FORWARD_NEIGHBOURS = ((1, 0), (1, 1), (0, 1), (-1, 1))
+
+
+class SpatialHash:
+    """Равномерная сетка (пространственный хэш) для быстрого поиска соседей"""
+
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def clear(self):
+        self.cells.clear()
+
+    def cell_of(self, x, y):
+        """Возвращает координаты ячейки для точки"""
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def rebuild(self, sprites, cell_size=None):
+        """Заново раскладывает спрайты по ячейкам (O(n))"""
+        if cell_size:
+            self.cell_size = max(1, cell_size)
+
+        self.cells = {}
+        cells = self.cells
+        size = self.cell_size
+        for sprite in sprites:
+            key = (int(math.floor(sprite.center_x / size)), int(math.floor(sprite.center_y / size)))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [sprite]
+            else:
+                bucket.append(sprite)
+
+    def insert(self, sprite):
+        """Добавляет один объект (с center_x/center_y) без перестройки сетки"""
+        key = self.cell_of(sprite.center_x, sprite.center_y)
+        bucket = self.cells.get(key)
+        if bucket is None:
+            self.cells[key] = [sprite]
+        else:
+            bucket.append(sprite)
+
+    def query(self, x, y, radius):
+        """Возвращает спрайты из ячеек, которые задевает круг (x, y, radius)"""
+        size = self.cell_size
+        min_cx = int(math.floor((x - radius) / size))
+        max_cx = int(math.floor((x + radius) / size))
+        min_cy = int(math.floor((y - radius) / size))
+        max_cy = int(math.floor((y + radius) / size))
+
+        found = []
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket:
+                    found.extend(bucket)
+        return found
+
+
+def overlapping_pairs(xs, ys, radii, cell_size):
+    """Пары пересекающихся кругов: (i, j, dx, dy, distance_sq), каждая пара один раз
+
+    Та же сетка, что у SpatialHash, но на массивах: точки сортируются по
+    ячейкам, а пары кандидатов из ячейки и ее соседей "вперёд" строятся
+    и проверяются numpy целиком. Плотная ячейка (толпа вокруг игрока)
+    остается квадратичной по числу пар, но без цикла Python на пару.
+    cell_size не меньше самого большого диаметра - тогда все пересечения
+    лежат в соседних ячейках.
+    """
+    cx = np.floor(xs / cell_size).astype(np.int64)
+    cy = np.floor(ys / cell_size).astype(np.int64)
+    cx -= cx.min()
+    cy -= cy.min()
+    # Ключ ячейки - одно число; cy + 1 не переходит в следующий столбец
+    stride = int(cy.max()) + 2
+    keys = cx * stride + cy
+
+    # Дальше работаем с точками, отсортированными по ячейкам: точки ячейки
+    # лежат подряд, и в исходные номера переводятся только найденные пары
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    counts = np.diff(np.r_[starts, len(keys)])
+    cell_keys = keys[starts]
+    xs, ys, radii = xs[order], ys[order], radii[order]
+
+    # Пары ячеек (своя, соседняя); своя - только пары i < j
+    own = np.flatnonzero(counts > 1)
+    cells_a, cells_b, same = [own], [own], [np.ones(len(own), dtype=bool)]
+    for ox, oy in FORWARD_NEIGHBOURS:
+        wanted = cell_keys + (ox * stride + oy)
+        found = np.minimum(np.searchsorted(cell_keys, wanted), len(cell_keys) - 1)
+        cells = np.flatnonzero(cell_keys[found] == wanted)
+        cells_a.append(cells)
+        cells_b.append(found[cells])
+        same.append(np.zeros(len(cells), dtype=bool))
+    cells_a = np.concatenate(cells_a)
+    cells_b = np.concatenate(cells_b)
+    same = np.concatenate(same)
+
+    # Строка - одна точка ячейки a и подряд идущие кандидаты из ячейки b
+    count_a = counts[cells_a]
+    local = np.arange(int(count_a.sum())) - np.repeat(np.cumsum(count_a) - count_a, count_a)
+    row_first = np.repeat(starts[cells_a], count_a) + local
+    row_second = np.repeat(starts[cells_b], count_a)
+    row_length = np.repeat(counts[cells_b], count_a)
+    row_same = np.repeat(same, count_a)
+    row_second[row_same] += local[row_same] + 1
+    row_length[row_same] -= local[row_same] + 1
+
+    offsets = np.cumsum(row_length) - row_length
+    first = np.repeat(row_first, row_length)
+    second = np.arange(int(row_length.sum())) + np.repeat(row_second - offsets, row_length)
+
+    dx = xs[first] - xs[second]
+    dy = ys[first] - ys[second]
+    distance_sq = dx * dx + dy * dy
+    min_distance = radii[first] + radii[second]
+    # Номера вместо булевой маски: одно сжатие вместо пяти
+    hit = np.flatnonzero(distance_sq < min_distance * min_distance)
+    return order[first[hit]], order[second[hit]], dx[hit], dy[hit], distance_sq[hit]
@@ -0,0 +1,95 @@
+import numpy as np
+
+
+class SpawnSlot:
+    """Место будущего врага: позиция проверена, но спрайт еще не создан"""
+
+    __slots__ = ('center_x', 'center_y', 'enemy_type')
+
+    def __init__(self, x, y, enemy_type):
+        self.center_x = x
+        self.center_y = y
+        self.enemy_type = enemy_type
+
+
+class SpawnIndex:
+    """Клетки, где можно спавнить врагов, и расстояние от них до игрока
+
+    Строится один раз при загрузке уровня. Годная клетка - та, в центре
+    которой квадрат 2*clearance не задевает ни одной стены и которая не
+    ближе margin к краю игрового поля. Игровое поле - карта или экран,
+    что больше (за картой стен нет).
+
+    Расстояния до игрока пересчитываются только когда игрок перешел в
+    другую клетку: клетки сортируются по расстоянию, и любой запрос
+    "от min до max" - это отрезок отсортированного массива (два
+    searchsorted), а выбор точки внутри него - O(1).
+    """
+
+    def __init__(self, solid, tile_width, tile_height, field_width, field_height, clearance=25, margin=100):
+        # field_width/field_height - размер игрового поля в пикселях
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        cols = int(-(-field_width // tile_width))
+        rows = int(-(-field_height // tile_height))
+
+        # Таблица сумм: сколько стен в любом прямоугольнике клеток за O(1)
+        walls = np.zeros((rows, cols), dtype=np.int32)
+        height, width = min(rows, solid.shape[0]), min(cols, solid.shape[1])
+        walls[:height, :width] = solid[:height, :width]
+        table = np.zeros((rows + 1, cols + 1), dtype=np.int32)
+        table[1:, 1:] = walls.cumsum(0).cumsum(1)
+
+        xs = (np.arange(cols) + 0.5) * tile_width
+        ys = (np.arange(rows) + 0.5) * tile_height
+        # Клетки, которые задевает квадрат вокруг центра (как Level.is_rect_blocked)
+        col0 = np.clip(((xs - clearance) // tile_width).astype(np.intp), 0, cols)
+        col1 = np.clip(((xs + clearance - 1) // tile_width).astype(np.intp) + 1, 0, cols)
+        row0 = np.clip(((ys - clearance) // tile_height).astype(np.intp), 0, rows)
+        row1 = np.clip(((ys + clearance - 1) // tile_height).astype(np.intp) + 1, 0, rows)
+        blocked = (table[row1[:, None], col1[None, :]] - table[row0[:, None], col1[None, :]]
+                   - table[row1[:, None], col0[None, :]] + table[row0[:, None], col0[None, :]]) > 0
+
+        inside_x = (xs >= margin) & (xs <= field_width - margin)
+        inside_y = (ys >= margin) & (ys <= field_height - margin)
+        valid = ~blocked & inside_y[:, None] & inside_x[None, :]
+
+        rows_valid, cols_valid = np.nonzero(valid)
+        self.xs = xs[cols_valid]
+        self.ys = ys[rows_valid]
+
+        self.player_cell = None
+        self.order = None  # номера клеток по возрастанию расстояния до игрока
+        self.distances = None  # эти расстояния (отсортированы)
+
+    def __len__(self):
+        return len(self.xs)
+
+    def update(self, x, y):
+        """Поле расстояний от игрока (пересчет, только если он сменил клетку)"""
+        cell = (int(x // self.tile_width), int(y // self.tile_height))
+        if cell == self.player_cell:
+            return
+        self.player_cell = cell
+        # Расстояние от центра клетки игрока - одинаковое, пока он в ней
+        px = (cell[0] + 0.5) * self.tile_width
+        py = (cell[1] + 0.5) * self.tile_height
+        distances = np.hypot(self.xs - px, self.ys - py)
+        self.order = np.argsort(distances, kind="stable")
+        self.distances = distances[self.order]
+
+    def band(self, x, y, min_distance, max_distance=None):
+        """Отрезок (lo, hi) отсортированных клеток на расстоянии [min, max] от (x, y)"""
+        self.update(x, y)
+        lo = int(np.searchsorted(self.distances, min_distance, side="left"))
+        hi = len(self.distances) if max_distance is None else \
+            int(np.searchsorted(self.distances, max_distance, side="right"))
+        return lo, hi
+
+    def pick(self, rng, band):
+        """Случайная клетка из отрезка band: (x, y) или None, если он пуст"""
+        lo, hi = band
+        if lo >= hi:
+            return None
+        cell = self.order[rng.randrange(lo, hi)]
+        return float(self.xs[cell]), float(self.ys[cell])
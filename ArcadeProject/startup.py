@@ -0,0 +1,50 @@
+"""Замер холодного старта игры по фазам
+
+Модуль импортируется первым в game.py, поэтому отсчет идет почти с начала
+импорта. Каждая mark(фаза) записывает время с предыдущей отметки:
+
+    import       - импорт game.py и всех зависимостей (arcade, numpy...)
+    console      - приветствие в консоли и настройка логов
+    window       - создание окна и OpenGL-контекста
+    simulation   - Simulation: игрок, его текстуры, пулы, ИИ
+    map          - загрузка уровня (из кэша levelcache или компиляция)
+    first_frame  - первый on_update + on_draw (раскладка шрифтов HUD)
+    textures     - фоновая догрузка остальных текстур (идет уже в игре)
+"""
+import json
+import time
+
+_started = time.perf_counter()
+
+
+class StartupTimer:
+    def __init__(self, started=None):
+        self.started = time.perf_counter() if started is None else started
+        self.last = self.started
+        self.phases = []  # (фаза, секунды)
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    @property
+    def total(self):
+        return self.last - self.started
+
+    def lines(self):
+        lines = [f"{phase:<14}{seconds * 1000:>9.1f} мс" for phase, seconds in self.phases]
+        lines.append(f"{'всего':<14}{self.total * 1000:>9.1f} мс")
+        return lines
+
+    def dump(self, path):
+        """Сохраняет фазы в JSON (чтобы следить за временем старта между версиями)"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "phases_ms": {phase: seconds * 1000 for phase, seconds in self.phases},
+                "total_ms": self.total * 1000,
+            }, f, indent=2)
+        return path
+
+
+timer = StartupTimer(_started)
@@ -0,0 +1,129 @@
+import numpy as np
+
+
+class EnemySteering:
+    """Пакетный ИИ врагов на NumPy
+
+    Позиции, скорости, коды типов и таймеры всех врагов собираются в массивы,
+    после чего движение к игроку, отход стрелков, ближняя атака и дальность
+    стрельбы считаются несколькими операциями над массивами. Результат
+    записывается обратно в спрайты одним проходом.
+    """
+
+    def __init__(self, enemy_types, kite_bands=None, shoot_ranges=None, shoot_cooldowns=None,
+                 melee_range=40):
+        self.type_codes = {enemy_type: code for code, enemy_type in enumerate(enemy_types)}
+        count = len(self.type_codes)
+        self.melee_range = melee_range
+
+        # Таблицы по коду типа
+        self.kites = np.zeros(count, dtype=bool)
+        self.kite_min = np.zeros(count)
+        self.kite_max = np.zeros(count)
+        for enemy_type, (near, far) in (kite_bands or {}).items():
+            code = self.type_codes[enemy_type]
+            self.kites[code] = True
+            self.kite_min[code] = near
+            self.kite_max[code] = far
+
+        self.shoots = np.zeros(count, dtype=bool)
+        self.shoot_range = np.zeros(count)
+        self.shoot_cooldown = np.zeros(count)
+        for enemy_type, shoot_range in (shoot_ranges or {}).items():
+            code = self.type_codes[enemy_type]
+            self.shoots[code] = True
+            self.shoot_range[code] = shoot_range
+            self.shoot_cooldown[code] = (shoot_cooldowns or {}).get(enemy_type, 0)
+
+    def update(self, enemies, player, delta_time, flow_field=None):
+        """Аналог SpriteList.update для всех врагов сразу
+
+        flow_field - поле направлений по карте: идущие к игроку враги обходят
+        стены по нему, а там, где поля нет, идут напрямую.
+        """
+        sprites = list(enemies)
+        n = len(sprites)
+        if n == 0:
+            return
+
+        type_codes = self.type_codes
+        codes = np.fromiter((type_codes[enemy.enemy_type] for enemy in sprites), dtype=np.intp, count=n)
+        x = np.fromiter((enemy.center_x for enemy in sprites), dtype=float, count=n)
+        y = np.fromiter((enemy.center_y for enemy in sprites), dtype=float, count=n)
+        speed = np.fromiter((enemy.speed for enemy in sprites), dtype=float, count=n)
+        since_attack = np.fromiter((enemy.time_since_attack for enemy in sprites), dtype=float, count=n)
+        since_shot = np.fromiter((enemy.time_since_shot for enemy in sprites), dtype=float, count=n)
+        attack_cooldown = np.fromiter((enemy.attack_cooldown for enemy in sprites), dtype=float, count=n)
+
+        shoots = self.shoots[codes]
+        since_attack += delta_time
+        since_shot[shoots] += delta_time
+
+        since_attack_list = since_attack.tolist()
+        since_shot_list = since_shot.tolist()
+
+        if not (player and player.health > 0):
+            # Игрок мёртв - только анимация и таймеры
+            for i, enemy in enumerate(sprites):
+                enemy.update_animation(delta_time)
+                enemy.time_since_attack = since_attack_list[i]
+                enemy.time_since_shot = since_shot_list[i]
+            return
+
+        dx = player.center_x - x
+        dy = player.center_y - y
+        dist = np.maximum(1.0, np.sqrt(dx * dx + dy * dy))
+
+        # ИИ в зависимости от типа: 1 - к игроку, -1 - от игрока, 0 - стоять
+        factor = np.ones(n)
+        kites = self.kites[codes]
+        too_far = dist > self.kite_max[codes]
+        too_close = dist < self.kite_min[codes]
+        factor[kites & ~too_far & too_close] = -1.0
+        factor[kites & ~too_far & ~too_close] = 0.0
+
+        dir_x = dx / dist
+        dir_y = dy / dist
+        if flow_field is not None:
+            flow_x, flow_y, valid = flow_field.directions(x, y)
+            follow = valid & (factor > 0)
+            dir_x[follow] = flow_x[follow]
+            dir_y[follow] = flow_y[follow]
+
+        change_x = dir_x * speed * delta_time * factor
+        change_y = dir_y * speed * delta_time * factor
+        new_x = x + change_x
+        new_y = y + change_y
+
+        # Ближняя атака (по позиции после шага) и стрельба (по дистанции до шага)
+        melee = np.sqrt((new_x - player.center_x) ** 2 + (new_y - player.center_y) ** 2) < self.melee_range
+        melee &= since_attack >= attack_cooldown
+        shoot = shoots & (dist <= self.shoot_range[codes]) & (since_shot >= self.shoot_cooldown[codes])
+
+        dx_list = dx.tolist()
+        dy_list = dy.tolist()
+        change_x_list = change_x.tolist()
+        change_y_list = change_y.tolist()
+        new_x_list = new_x.tolist()
+        new_y_list = new_y.tolist()
+
+        for i, enemy in enumerate(sprites):
+            enemy.update_animation(delta_time)
+            enemy.time_since_attack = since_attack_list[i]
+            enemy.time_since_shot = since_shot_list[i]
+            enemy.update_direction(dx_list[i], dy_list[i])
+
+            enemy.change_x = change_x_list[i]
+            enemy.change_y = change_y_list[i]
+            enemy.position = (new_x_list[i], new_y_list[i])
+
+            if enemy.light:
+                enemy.light.position = enemy.position
+
+        for i in np.flatnonzero(melee).tolist():
+            sprites[i].attack_player()
+            sprites[i].time_since_attack = 0
+
+        for i in np.flatnonzero(shoot).tolist():
+            sprites[i].shoot()
+            sprites[i].time_since_shot = 0
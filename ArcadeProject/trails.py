@@ -0,0 +1,235 @@
+import numpy as np
+import arcade
+from arcade.gl import BufferDescription
+from pyglet import gl
+
+# Оттенки искр (как у прежних текстур make_soft_circle_texture)
+SPARK_COLORS = (arcade.color.WHITE_SMOKE, arcade.color.WHITE, arcade.color.GHOST_WHITE)
+SPARK_SIZE = 10  # Диаметр искры при scale=1
+
+
+class TrailEmitter:
+    """След одного объекта: держит maintain живых частиц в точке (center_x, center_y)"""
+
+    def __init__(self, system, slot, x, y, maintain):
+        self.system = system
+        self.slot = slot
+        self.center_x = x
+        self.center_y = y
+        self.maintain = maintain
+
+    def clear(self):
+        """Убирает все частицы этого следа (пуля из пула вылетела заново)"""
+        self.system.clear_slot(self.slot)
+
+    def get_count(self):
+        return self.system.count_of(self.slot)
+
+
+class ParticleSystem:
+    """Все частицы следов в одном наборе массивов
+
+    Эмиттеры (TrailEmitter) только хранят позицию и нужное число частиц.
+    Рождение, движение, затухание и удаление частиц выполняются над
+    массивами сразу для всех следов, а рисуются частицы одним вызовом
+    (ParticleRenderer). Эмиттеры, которых нет в списке emitters, новые
+    частицы не рождают.
+    """
+
+    def __init__(self, emitters=None, capacity=2048, lifetime=(0.35, 0.6), scale=(0.5, 2.0),
+                 spread=3.0, start_alpha=220, end_alpha=0, seed=None):
+        self.emitters = emitters if emitters is not None else []
+        self.lifetime_range = lifetime
+        self.scale_range = scale
+        self.spread = spread
+        self.start_alpha = start_alpha
+        self.end_alpha = end_alpha
+        self.rng = np.random.default_rng(seed)
+        self.slots = 0  # сколько следов создано
+
+        self.count = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.age = np.zeros(capacity)
+        self.lifetime = np.ones(capacity)
+        self.scale = np.ones(capacity)
+        self.color = np.zeros(capacity, dtype=np.intp)
+        self.owner = np.zeros(capacity, dtype=np.intp)
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        old = (self.x, self.y, self.vx, self.vy, self.age, self.lifetime, self.scale, self.color, self.owner)
+        self._allocate(capacity)
+        new = (self.x, self.y, self.vx, self.vy, self.age, self.lifetime, self.scale, self.color, self.owner)
+        for src, dst in zip(old, new):
+            dst[:self.count] = src[:self.count]
+
+    def make_emitter(self, x, y, maintain):
+        """Создает след (в списке emitters его нужно регистрировать отдельно)"""
+        emitter = TrailEmitter(self, self.slots, x, y, maintain)
+        self.slots += 1
+        return emitter
+
+    def counts(self):
+        """Сколько живых частиц у каждого следа (по номеру slot)"""
+        return np.bincount(self.owner[:self.count], minlength=self.slots)
+
+    def count_of(self, slot):
+        return int(np.count_nonzero(self.owner[:self.count] == slot))
+
+    def clear_slot(self, slot):
+        self._keep(self.owner[:self.count] != slot)
+
+    def _keep(self, mask):
+        """Оставляет только частицы с mask=True (сжатие массивов)"""
+        n = int(np.count_nonzero(mask))
+        if n == self.count:
+            return
+        for array in (self.x, self.y, self.vx, self.vy, self.age, self.lifetime, self.scale, self.color, self.owner):
+            array[:n] = array[:self.count][mask]
+        self.count = n
+
+    def emit(self, slots, xs, ys, amounts):
+        """Рождает amounts[i] частиц следа slots[i] в точке (xs[i], ys[i])"""
+        total = int(amounts.sum())
+        if total <= 0:
+            return
+        if self.count + total > self.capacity:
+            self._grow(self.count + total)
+
+        rng = self.rng
+        start, end = self.count, self.count + total
+        self.owner[start:end] = np.repeat(slots, amounts)
+        self.x[start:end] = np.repeat(xs, amounts)
+        self.y[start:end] = np.repeat(ys, amounts)
+
+        # Равномерно внутри круга радиуса spread (как rand_in_circle)
+        angle = rng.uniform(0, 2 * np.pi, total)
+        radius = self.spread * np.sqrt(rng.random(total))
+        self.vx[start:end] = np.cos(angle) * radius
+        self.vy[start:end] = np.sin(angle) * radius
+
+        self.age[start:end] = 0
+        self.lifetime[start:end] = rng.uniform(*self.lifetime_range, total)
+        self.scale[start:end] = rng.uniform(*self.scale_range, total)
+        self.color[start:end] = rng.integers(0, len(SPARK_COLORS), total)
+        self.count = end
+
+    def update(self, delta_time=1 / 60):
+        """Один шаг для всех частиц: досоздать, сдвинуть, состарить, удалить отжившие"""
+        if self.emitters:
+            counts = self.counts()
+            emitters = list(self.emitters)
+            slots = np.fromiter((e.slot for e in emitters), dtype=np.intp, count=len(emitters))
+            wanted = np.fromiter((e.maintain for e in emitters), dtype=np.intp, count=len(emitters))
+            amounts = np.maximum(0, wanted - counts[slots])
+            if amounts.any():
+                xs = np.fromiter((e.center_x for e in emitters), dtype=float, count=len(emitters))
+                ys = np.fromiter((e.center_y for e in emitters), dtype=float, count=len(emitters))
+                self.emit(slots, xs, ys, amounts)
+
+        n = self.count
+        if n == 0:
+            return
+
+        # Скорость частиц - в пикселях за кадр при 60 FPS (как у Sprite.update)
+        step = delta_time * 60
+        self.x[:n] += self.vx[:n] * step
+        self.y[:n] += self.vy[:n] * step
+        self.age[:n] += delta_time
+        self._keep(self.age[:n] < self.lifetime[:n])
+
+    def alpha(self):
+        """Прозрачность живых частиц 0..255 (линейно от start_alpha к end_alpha)"""
+        n = self.count
+        t = self.age[:n] / self.lifetime[:n]
+        return np.clip(self.start_alpha + (self.end_alpha - self.start_alpha) * t, 0, 255)
+
+
+class ParticleRenderer:
+    """Рисует все частицы ParticleSystem одним draw call (точки с мягким краем)"""
+
+    VERTEX_SHADER = """
+    #version 330
+    uniform WindowBlock {
+        mat4 projection;
+        mat4 view;
+    } window;
+
+    in vec2 in_pos;
+    in float in_size;
+    in vec4 in_color;
+    out vec4 v_color;
+
+    void main() {
+        gl_Position = window.projection * window.view * vec4(in_pos, 0.0, 1.0);
+        gl_PointSize = in_size;
+        v_color = in_color;
+    }
+    """
+
+    FRAGMENT_SHADER = """
+    #version 330
+    in vec4 v_color;
+    out vec4 f_color;
+
+    void main() {
+        // Мягкий круг: прозрачность падает от центра к краю
+        float dist = length(gl_PointCoord - vec2(0.5)) * 2.0;
+        if (dist > 1.0) discard;
+        f_color = vec4(v_color.rgb, v_color.a * (1.0 - dist));
+    }
+    """
+
+    FLOATS = 7  # x, y, size, r, g, b, a
+
+    def __init__(self, ctx, system):
+        self.ctx = ctx
+        self.system = system
+        self.program = ctx.program(vertex_shader=self.VERTEX_SHADER, fragment_shader=self.FRAGMENT_SHADER)
+        self.palette = np.array([color[:3] for color in SPARK_COLORS], dtype=np.float32) / 255.0
+        self.capacity = 0
+        self.buffer = None
+        self.geometry = None
+        self.data = None
+
+    def _ensure_capacity(self, count):
+        if count <= self.capacity:
+            return
+        self.capacity = max(count, self.capacity * 2, 1024)
+        self.data = np.zeros((self.capacity, self.FLOATS), dtype=np.float32)
+        self.buffer = self.ctx.buffer(reserve=self.data.nbytes, usage="stream")
+        self.geometry = self.ctx.geometry(
+            [BufferDescription(self.buffer, "2f 1f 4f", ["in_pos", "in_size", "in_color"])],
+            mode=self.ctx.POINTS,
+        )
+
+    def draw(self):
+        system = self.system
+        n = system.count
+        if n == 0:
+            return 0
+        self._ensure_capacity(n)
+
+        data = self.data
+        data[:n, 0] = system.x[:n]
+        data[:n, 1] = system.y[:n]
+        data[:n, 2] = system.scale[:n] * SPARK_SIZE
+        data[:n, 3:6] = self.palette[system.color[:n]]
+        data[:n, 6] = system.alpha() / 255.0
+        self.buffer.write(data[:n].tobytes())
+
+        ctx = self.ctx
+        ctx.enable(ctx.BLEND, gl.GL_PROGRAM_POINT_SIZE)
+        ctx.blend_func = ctx.BLEND_DEFAULT
+        self.geometry.render(self.program, vertices=n)
+        ctx.disable(gl.GL_PROGRAM_POINT_SIZE)
+        return 1